@@ -2,11 +2,18 @@ import itertools
 import os
 import re
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
+import argh
+import numpy as np
 import pandas as pd
 from loguru import logger
 
+from courier.extract.utils import file_hash
+
+# NOTE: Increase when changing how the article index is processed, invalidates cached article indexes
+ARTICLE_INDEX_VERSION: int = 2
+
 
 def get_english_host_item(host_item: str) -> Optional[str]:
     items = [x for x in host_item.split('|') if x.endswith('eng')]
@@ -42,27 +49,55 @@ def get_expanded_article_pages(page_ref: str) -> List[int]:
     return sorted(list(ix))
 
 
-def get_article_index_from_file(filename: Union[str, bytes, os.PathLike]) -> pd.DataFrame:
-    """Returns a pandas data frame that contains a processed version if the Courier article index
+def extract_courier_ids(eng_host_items: pd.Series) -> pd.Series:
+    """Vectorized version of `get_courier_id`"""
+    items: List[str] = eng_host_items.fillna('').tolist()
+
+    # Match all host items in one pass, one (possibly empty) match per line
+    courier_ids: List[str] = re.findall(r'(?m)^(?:.*[^\S\n](\d+)[^\S\n]eng|.*)$', '\n'.join(items))
+    if len(courier_ids) != len(items):
+        # Host items that span several lines, fall back to matching one at a time
+        return eng_host_items.apply(get_courier_id)
+
+    for item, courier_id in zip(items, courier_ids):
+        if courier_id == '':
+            logger.debug(f'No match found for "{item}"')
+        elif len(courier_id) > 6:
+            raise ValueError(f'ID too long: {courier_id}. Must be <= 6')
+    return pd.Series(
+        [courier_id.zfill(6) if courier_id else None for courier_id in courier_ids],
+        index=eng_host_items.index,
+        dtype=object,
+    )
 
-    Args:
-        filename (Union[str, bytes, os.PathLike]): [description]
 
-    Returns:
-        pd.DataFrame: [description]
-    """
-    columns = [
-        'Record number',
-        'Catalogue - Title',
-        'Languages',
-        'Document type',
-        'Host item',
-        'Catalogue - Publication date',
-    ]
-    dtypes = {'Record number': 'uint32', 'Document type': 'category'}
+def expand_article_pages(page_refs: pd.Series) -> pd.Series:
+    """Vectorized version of `get_expanded_article_pages`"""
+    # Scan all page references in one pass, an empty match in the first group marks the start of the next reference
+    tokens = re.findall(r'(\x1e)|(\d+)(?:-(\d+))?', '\x1e'.join(page_refs.tolist()))
+    tokens = np.array(tokens, dtype=str).reshape(-1, 3)
+    is_separator = tokens[:, 0] != ''
+    owners = np.cumsum(is_separator)[~is_separator]
+    first_pages = tokens[~is_separator, 1].astype(int)
+    last_pages = np.where(tokens[~is_separator, 2] == '', tokens[~is_separator, 1], tokens[~is_separator, 2]).astype(
+        int
+    )
 
-    # Create article index
-    article_index = pd.read_csv(filename, usecols=columns, sep=';', dtype=dtypes, memory_map=True)
+    # Expand each range, then sort pages within each article
+    lengths = np.clip(last_pages - first_pages + 1, 0, None)
+    owners = np.repeat(owners, lengths)
+    steps = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    pages = np.repeat(first_pages, lengths) + steps
+    order = np.lexsort((pages, owners))
+
+    values: List[int] = pages[order].tolist()
+    offsets: List[int] = np.concatenate([[0], np.cumsum(np.bincount(owners, minlength=len(page_refs)))]).tolist()
+    return pd.Series(
+        [values[offsets[i] : offsets[i + 1]] for i in range(len(page_refs))], index=page_refs.index, dtype=object
+    )
+
+
+def _process_article_index(article_index: pd.DataFrame) -> pd.DataFrame:
     article_index.columns = [
         'record_number',
         'catalogue_title',
@@ -74,26 +109,59 @@ def get_article_index_from_file(filename: Union[str, bytes, os.PathLike]) -> pd.
 
     # Keep only articles in english
     article_index = article_index[article_index['document_type'] == 'article']
-    article_index = article_index[article_index.languages.str.contains('eng')]
-    article_index.reset_index()
+    article_index = article_index[article_index.languages.str.contains('eng', regex=False)]
 
     # From host_item
-    article_index['eng_host_item'] = article_index['host_item'].apply(get_english_host_item)
-    article_index.drop(columns=['document_type', 'languages', 'host_item'], axis=1, inplace=True)
+    article_index = article_index.assign(eng_host_item=article_index['host_item'].apply(get_english_host_item))
+    article_index = article_index.drop(columns=['document_type', 'languages', 'host_item'])
 
     # - get article pages
     pattern = r'((?:p\.\,?|pages?)(?:\s*\d+(?:-\d+)*)(?:\,\s*\d{1,3}(?:-\d{1,3})*\s)*)'
     article_index['page_ref'] = article_index['eng_host_item'].str.extract(pattern).values
     article_index.loc[article_index.record_number == 187812, 'page_ref'] = 'p. 18-31'  # Manual fix
     article_index.loc[article_index.record_number == 64927, 'page_ref'] = 'p. 28-29'  # Manual fix
-    article_index['pages'] = article_index.page_ref.apply(get_expanded_article_pages)
+    article_index['pages'] = expand_article_pages(article_index.page_ref)
     article_index.drop(columns=['page_ref'], axis=1, inplace=True)
 
     # - get courier_id
-    article_index['courier_id'] = article_index.eng_host_item.apply(get_courier_id)
+    article_index['courier_id'] = extract_courier_ids(article_index.eng_host_item)
 
     # Get year
-    article_index['year'] = article_index.publication_date.apply(lambda x: int(x[:4])).astype('uint16')
+    article_index['year'] = article_index.publication_date.str[:4].astype(int).astype('uint16')
+
+    return article_index
+
+
+def get_article_index_from_file(
+    filename: Union[str, bytes, os.PathLike], chunksize: Optional[int] = None
+) -> pd.DataFrame:
+    """Returns a pandas data frame that contains a processed version if the Courier article index
+
+    Args:
+        filename (Union[str, bytes, os.PathLike]): Metadata file (CSV)
+        chunksize (Optional[int], optional): Read and process the file `chunksize` rows at a time, for files
+            that don't fit comfortably in memory. Defaults to None (read the whole file at once).
+
+    Returns:
+        pd.DataFrame: Article index with columns courier_id, year, record_number, pages and catalogue_title
+    """
+    columns = [
+        'Record number',
+        'Catalogue - Title',
+        'Languages',
+        'Document type',
+        'Host item',
+        'Catalogue - Publication date',
+    ]
+    dtypes = {'Record number': 'uint32', 'Document type': 'category'}
+
+    # Create article index
+    if chunksize is None:
+        article_index = pd.read_csv(filename, usecols=columns, sep=';', dtype=dtypes, memory_map=True)
+        article_index = _process_article_index(article_index)
+    else:
+        chunks = pd.read_csv(filename, usecols=columns, sep=';', dtype=dtypes, memory_map=True, chunksize=chunksize)
+        article_index = pd.concat([_process_article_index(chunk) for chunk in chunks])
 
     # Set index
     article_index = article_index.set_index(article_index['courier_id'].astype('uint32'))
@@ -102,8 +170,61 @@ def get_article_index_from_file(filename: Union[str, bytes, os.PathLike]) -> pd.
     return article_index[['courier_id', 'year', 'record_number', 'pages', 'catalogue_title']]
 
 
+def get_article_index_cache_file(filename: Union[str, os.PathLike]) -> Path:
+    """Returns the path of the binary cache of the article index processed from `filename`"""
+    return Path(filename).with_suffix('.article_index.pkl')
+
+
+def _article_index_cache_key(filename: Union[str, os.PathLike]) -> Dict[str, Any]:
+    return {'version': ARTICLE_INDEX_VERSION, 'sha1': file_hash(filename)}
+
+
+def save_article_index_cache(filename: Union[str, os.PathLike]) -> pd.DataFrame:
+    """Processes the article index in `filename` and stores the result in a binary cache next to it"""
+    article_index = get_article_index_from_file(filename)
+    cache_file = get_article_index_cache_file(filename)
+    # Write to a temporary file first, so that concurrent readers never see a partially written cache
+    tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+    pd.to_pickle({'key': _article_index_cache_key(filename), 'article_index': article_index}, tmp_file)
+    os.replace(tmp_file, cache_file)
+    return article_index
+
+
+def load_article_index(filename: Union[str, os.PathLike], use_cache: bool = True) -> pd.DataFrame:
+    """Returns the processed article index in `filename`.
+
+    The binary cache is used if it was created from the same file content by the same `ARTICLE_INDEX_VERSION`,
+    otherwise the cache is rebuilt.
+    """
+    if not use_cache:
+        return get_article_index_from_file(filename)
+    cache_file = get_article_index_cache_file(filename)
+    if cache_file.exists():
+        try:
+            data = pd.read_pickle(cache_file)
+            if data['key'] == _article_index_cache_key(filename):
+                return data['article_index']
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f'Ignoring unreadable article index cache {cache_file}: {e}')
+    try:
+        return save_article_index_cache(filename)
+    except OSError as e:
+        logger.warning(f'Unable to write article index cache {cache_file}: {e}')
+        return get_article_index_from_file(filename)
+
+
+def rebuild_article_index_cache(filename: str) -> None:
+    """Rebuilds the binary cache of the article index in `filename`"""
+    article_index = save_article_index_cache(filename)
+    logger.info(f'Cached {len(article_index)} articles in {get_article_index_cache_file(filename)}')
+
+
 def article_index_to_csv(
     article_index: pd.DataFrame, output_folder: Union[str, os.PathLike], sep: str = '\t', save_index: bool = False
 ) -> None:
     Path(output_folder).mkdir(exist_ok=True)
     article_index.to_csv(Path(output_folder) / 'article_index.csv', sep=sep, index=save_index)
+
+
+if __name__ == '__main__':
+    argh.dispatch_command(rebuild_article_index_cache)
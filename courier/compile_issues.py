@@ -1,11 +1,14 @@
 import os
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
 import argh
 from jinja2 import Environment, PackageLoader, Template, select_autoescape
+from loguru import logger
 from tqdm import tqdm
 
+from courier.directory_index import DirectoryIndex
+from courier.issue_xml import PageOffsetIndex
 from courier.utils import cdata, get_courier_ids, valid_xml
 
 jinja_env = Environment(
@@ -24,12 +27,37 @@ def read(filename: Union[str, bytes, os.PathLike]) -> str:
     return text
 
 
-def join_pages(basename: str, folder: Union[str, os.PathLike], template: Optional[Template] = None) -> str:
+def read_pages(page_files: Iterable[Path]) -> Iterator[str]:
+    """Yields the text of each page file, reading one file at a time"""
+    for page in page_files:
+        yield read(page)
+
+
+def generate_pages(
+    basename: str,
+    folder: Union[str, os.PathLike],
+    template: Optional[Template] = None,
+    page_files: Optional[List[Path]] = None,
+) -> Iterator[str]:
+    """Yields the rendering of the pages `{basename}*.txt` in `folder` (or `page_files`, if given) in chunks.
+
+    Page files are read as the template iterates over them, so only one page is in memory at a time (unless the
+    template needs the number of pages, e.g. `loop.length`).
+    """
     default_template = '{% for page in pages %}\n--- {{ loop.index }} ---\n{{ page|trim }}{% endfor %}'
     template = template or Template(default_template)
-    page_files = sorted(Path(folder).glob(f'{basename}*.txt'))
-    pages = [read(page) for page in page_files]
-    return template.render(basename=basename, pages=pages, template=template)
+    page_files = DirectoryIndex(folder).files(basename, '.txt') if page_files is None else page_files
+    return template.generate(basename=basename, pages=read_pages(page_files), template=template)
+
+
+def join_pages(
+    basename: str,
+    folder: Union[str, os.PathLike],
+    template: Optional[Template] = None,
+    page_files: Optional[List[Path]] = None,
+) -> str:
+    """Renders the pages `{basename}*.txt` in `folder` (or `page_files`, if given) with `template`"""
+    return ''.join(generate_pages(basename, folder, template, page_files))
 
 
 class IssueCompiler:
@@ -51,12 +79,28 @@ class IssueCompiler:
 
         Path(output_folder).mkdir(parents=True, exist_ok=True)
 
+        # Scan the input folder once, instead of a glob per basename
+        page_files: Dict[str, List[Path]] = DirectoryIndex(input_folder).match(basenames, '.txt')
+        missing, _ = DirectoryIndex.missing_and_duplicates(page_files)
+        if missing:
+            logger.warning(f'No pages found for {len(missing)} of {len(basenames)} issues')
+            logger.debug(f'No pages found for: {", ".join(missing)}')
+
         pbar = tqdm(basenames, desc='File')
         for basename in pbar:
             pbar.set_description(f'Processing {basename}')
-            if (len(list(Path(input_folder).glob(f'{basename}*.txt')))) > 0:
-                with open(Path(output_folder) / f'{basename}.{extension}', 'w') as fp:
-                    fp.write(join_pages(basename, input_folder, self.template))
+            if len(page_files[basename]) > 0:
+                output_file = Path(output_folder) / f'{basename}.{extension}'
+                with open(output_file, 'wb') as fp:
+                    for chunk in generate_pages(basename, input_folder, self.template, page_files[basename]):
+                        fp.write(chunk.encode('utf-8'))
+                self.write_offset_index(output_file)
+
+    def write_offset_index(self, output_file: Path) -> None:
+        """Writes a sidecar page offset index for `output_file`, if it contains any pages"""
+        index: PageOffsetIndex = PageOffsetIndex.create(output_file)
+        if len(index) > 0:
+            index.store(output_file)
 
 
 def pages_to_issues(
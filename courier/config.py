@@ -2,11 +2,13 @@ import csv
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 import pandas as pd
 
-from courier.article_index import get_article_index_from_file
+from courier.article_index import load_article_index
+from courier.page_index import PageIndex
+from courier.page_numbers import PageNumberMapping
 
 # from loguru import logger
 
@@ -34,6 +36,14 @@ def read_double_pages(
     return pages
 
 
+def group_article_index(article_index: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+    """Returns the records of `article_index` grouped by courier_id, in index order"""
+    issue_article_index: Dict[str, List[Dict[str, Any]]] = {}
+    for record in article_index.to_dict('records'):
+        issue_article_index.setdefault(record['courier_id'], []).append(record)
+    return issue_article_index
+
+
 @dataclass
 class CourierConfig:  # pylint: disable=too-many-instance-attributes
 
@@ -55,24 +65,76 @@ class CourierConfig:  # pylint: disable=too-many-instance-attributes
     exclusions_file: Path = metadata_dir / 'double_pages_exclusions.csv'
     overlap_file: Path = metadata_dir / 'overlap.csv'
     default_template: str = 'article.xml.jinja'
-    article_index: pd.DataFrame = None
-    double_pages: Dict[str, List[int]] = field(default_factory=dict)
 
-    def __post_init__(self) -> None:
-        self.article_index: pd.DataFrame = get_article_index_from_file(self.metadata_file)
-        self.double_pages: Dict[str, List[int]] = read_double_pages(self.exclusions_file, self.double_pages_file)
+    # Lazily loaded metadata, see `article_index` and `double_pages`
+    _article_index: Optional[pd.DataFrame] = field(default=None, init=False, repr=False)
+    _double_pages: Optional[Dict[str, List[int]]] = field(default=None, init=False, repr=False)
+    _issue_article_index: Optional[Dict[str, List[Dict[str, Any]]]] = field(default=None, init=False, repr=False)
+    _courier_ids: Optional[Set[str]] = field(default=None, init=False, repr=False)
+    _page_index: Optional[PageIndex] = field(default=None, init=False, repr=False)
+    _page_number_mappings: Dict[str, PageNumberMapping] = field(default_factory=dict, init=False, repr=False)
+
+    @property
+    def article_index(self) -> pd.DataFrame:
+        """The processed article index, read from `metadata_file` (or its binary cache) on first access"""
+        if self._article_index is None:
+            self._article_index = load_article_index(self.metadata_file)
+        return self._article_index
+
+    @article_index.setter
+    def article_index(self, value: pd.DataFrame) -> None:
+        self._article_index = value
+        self._issue_article_index = None
+        self._courier_ids = None
+        self._page_index = None
+
+    @property
+    def issue_article_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Article records grouped by courier_id, built from `article_index` on first access"""
+        if self._issue_article_index is None:
+            self._issue_article_index = group_article_index(self.article_index)
+        return self._issue_article_index
+
+    @property
+    def courier_ids(self) -> Set[str]:
+        """Set of courier_ids in `article_index`"""
+        if self._courier_ids is None:
+            self._courier_ids = set(self.issue_article_index)
+        return self._courier_ids
+
+    @property
+    def page_index(self) -> PageIndex:
+        """Page to articles index of `article_index`, built on first access"""
+        if self._page_index is None:
+            self._page_index = PageIndex(self.article_index)
+        return self._page_index
+
+    @property
+    def double_pages(self) -> Dict[str, List[int]]:
+        """PDF page numbers of double pages per courier_id, read from `double_pages_file` on first access"""
+        if self._double_pages is None:
+            self._double_pages = read_double_pages(self.exclusions_file, self.double_pages_file)
+        return self._double_pages
+
+    @double_pages.setter
+    def double_pages(self, value: Dict[str, List[int]]) -> None:
+        self._double_pages = value
+        self._page_number_mappings = {}
+
+    def get_page_number_mapping(self, courier_id: str) -> PageNumberMapping:
+        """Returns the page number mapping of an issue, built from `double_pages` on first access"""
+        if courier_id not in self._page_number_mappings:
+            self._page_number_mappings[courier_id] = PageNumberMapping(self.double_pages.get(courier_id, []))
+        return self._page_number_mappings[courier_id]
 
     def get_issue_article_index(self, courier_id: str) -> List[Dict[str, Any]]:
-        index: pd.DataFrame = self.article_index[self.article_index['courier_id'] == courier_id]
-        article_index: List[Dict[str, Any]] = [record for record in index.to_dict('records')]
+        article_index: List[Dict[str, Any]] = [dict(record) for record in self.issue_article_index.get(courier_id, [])]
         return article_index
 
 
 def get_config() -> CourierConfig:
+    """Returns the shared config. Creating it is cheap, metadata files are read on first access."""
     global _config
-    if _config is not None:
-        pass  # logger.debug('Config already loaded.')
     if _config is None:
-        # logger.debug('Loading config.')
         _config = CourierConfig()
     return _config
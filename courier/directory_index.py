@@ -0,0 +1,40 @@
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+
+class DirectoryIndex:
+    """Sorted names of the entries in a folder, scanned once, for prefix lookups instead of a glob per lookup.
+
+    `files(prefix, suffix)` returns the same paths as `sorted(Path(folder).glob(f'{prefix}*{suffix}'))`, for
+    prefixes and suffixes without wildcards. A folder that doesn't exist is treated as empty, as by glob.
+    """
+
+    def __init__(self, folder: Union[str, os.PathLike]):
+        self.folder: Path = Path(folder)
+        self.names: List[str] = sorted(os.listdir(folder)) if self.folder.is_dir() else []
+
+    def files(self, prefix: str, suffix: str = '') -> List[Path]:
+        files: List[Path] = []
+        for i in range(bisect_left(self.names, prefix), len(self.names)):
+            name: str = self.names[i]
+            if not name.startswith(prefix):
+                break
+            if name.endswith(suffix) and len(name) >= len(prefix) + len(suffix):
+                files.append(self.folder / name)
+        return files
+
+    def match(self, prefixes: Iterable[str], suffix: str = '') -> Dict[str, List[Path]]:
+        """Returns the files of each prefix, in the order of `prefixes`"""
+        return {prefix: self.files(prefix, suffix) for prefix in prefixes}
+
+    @staticmethod
+    def missing_and_duplicates(matches: Dict[str, List[Path]]) -> Tuple[List[str], List[str]]:
+        """Returns the prefixes in `matches` with no files, and those with more than one file"""
+        missing: List[str] = [prefix for prefix, files in matches.items() if len(files) == 0]
+        duplicates: List[str] = [prefix for prefix, files in matches.items() if len(files) > 1]
+        return missing, duplicates
+
+    def __len__(self) -> int:
+        return len(self.names)
@@ -1,18 +1,28 @@
 # pylint: disable=redefined-outer-name
 
 import io
+import multiprocessing
 import os
 import re
 import warnings
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple, Union
 
+import argh
 import ftfy
+import pandas as pd
 import untangle
+from loguru import logger
 
 from courier.config import get_config
+from courier.extract.cache import ExtractedIssueCache
 from courier.extract.java_extractor import ExtractedIssue, ExtractedPage, JavaExtractor
+from courier.page_index import PageIntervalIndex
+from courier.page_numbers import PageNumberMapping
+from courier.title_matching import TitleMatch, TitleMatcher
 from courier.utils import flatten, get_courier_ids, split_by_idx, valid_xml
 
 CONFIG = get_config()
@@ -27,32 +37,80 @@ def read_xml(filename: Union[str, bytes, os.PathLike]) -> untangle.Element:
         return element
 
 
+def iter_xml_pages(filename: Union[str, bytes, os.PathLike], chunk_size: int = 64 * 1024) -> Iterator[ExtractedPage]:
+    """Yields the pages of an issue XML-file (see `compile_issues`) one at a time.
+
+    The file is parsed incrementally, and each page element is discarded once it has been yielded, so memory
+    use is bounded by the size of a single page rather than by the whole document.
+    """
+    parser: ET.XMLPullParser = ET.XMLPullParser(events=('start', 'end'))
+    root: Optional[ET.Element] = None
+    pdf_page_number: int = 0
+    with open(filename, 'r', encoding='utf-8') as fp:
+        while chunk := fp.read(chunk_size):
+            parser.feed(valid_xml(chunk))
+            for item in parser.read_events():
+                event, element = item[0], item[-1]
+                if not isinstance(element, ET.Element):
+                    continue
+                if event == 'start':
+                    root = element if root is None else root
+                    continue
+                if element.tag != 'page':
+                    continue
+                pdf_page_number += 1
+                yield ExtractedPage(
+                    pdf_page_number=int(element.get('number', pdf_page_number)),
+                    content=element.text or '',
+                    titles=[],
+                )
+                if root is not None:
+                    root.clear()
+        parser.close()
+
+
 # NOTE: Needed for test discovery (WIP). Remove later if deemed deprecated.
 def get_xml_issue_content(courier_id: str) -> ExtractedIssue:
 
     if len(courier_id) != 6:
         raise ValueError(f'Not a valid courier id "{courier_id}')
-    if courier_id not in CONFIG.article_index.courier_id.values:
+    if courier_id not in CONFIG.courier_ids:
         raise ValueError(f'{courier_id} not in article index')
 
-    untangle_element = read_xml(list(CONFIG.xml_dir.glob(f'{courier_id}*.xml'))[0])
-    pages = []
-    for pdf_page_number, content in enumerate(untangle_element.document.page, 1):
-        page: ExtractedPage = ExtractedPage(pdf_page_number=pdf_page_number, content=content, titles=[])
-        pages.append(page)
-
+    pages: List[ExtractedPage] = list(iter_xml_pages(list(CONFIG.xml_dir.glob(f'{courier_id}*.xml'))[0]))
     issue: ExtractedIssue = ExtractedIssue(pages=pages)
     return issue
 
 
-def get_pdf_issue_content(courier_id: str) -> ExtractedIssue:
+def get_pdf_issue_content(courier_id: str, use_cache: bool = True) -> ExtractedIssue:
+    """Returns the content of the issue's PDF-file as extracted by `JavaExtractor`.
+
+    If `use_cache` is True, the result is read from (and stored in) the sidecar `ExtractedIssueCache`,
+    so that the JVM is only started when the PDF-file, or the extractor's parameters, have changed.
+    """
     extractor: JavaExtractor = JavaExtractor()
     filename: str = str(list(CONFIG.pdf_dir.glob(f'{courier_id}*.pdf'))[0])
-    issue: ExtractedIssue = extractor.extract_issue(filename)
+    if not use_cache:
+        return extractor.extract_issue(filename)
+
+    cache: ExtractedIssueCache = ExtractedIssueCache(extractor.parameters)
+    issue: Optional[ExtractedIssue] = cache.load(filename)
+    if issue is None:
+        issue = extractor.extract_issue(filename)
+        cache.store(filename, issue)
     return issue
 
 
+def get_issue_content(courier_id: str) -> ExtractedIssue:
+    """Returns the content of an issue, from its (cached) PDF-file or, if there is none, from its XML-file"""
+    if not any(CONFIG.pdf_dir.glob(f'{courier_id}*.pdf')) and any(CONFIG.xml_dir.glob(f'{courier_id}*.xml')):
+        return get_xml_issue_content(courier_id)
+    return get_pdf_issue_content(courier_id)
+
+
 class Page:
+    __slots__ = ('page_number', 'text', 'titles', 'articles')
+
     def __init__(
         self,
         page_number: int,
@@ -89,11 +147,25 @@ class Page:
 
 @dataclass
 class DoubleSpreadRightPage(Page):
+    __slots__ = ()
+
     def __init__(self, page_number: int):
         super().__init__(page_number=page_number, text='', titles=None)
 
 
 class Article:
+    __slots__ = (
+        'courier_issue',
+        'courier_id',
+        'year',
+        'record_number',
+        'page_numbers',
+        'catalogue_title',
+        'pages',
+        'texts',
+        'errors',
+    )
+
     def __init__(
         self,
         courier_issue: 'CourierIssue',
@@ -123,46 +195,88 @@ class Article:
     def max_page_number(self) -> int:
         return 0 if self.page_numbers is None else max(self.page_numbers)
 
-    def get_text(self) -> str:
-        text: str = ''
-        text += f'{5*"-"} Title according to index: {self.catalogue_title}\n'
-        text += f'{5*"-"} Pages according to index: {",".join(str(x) for x in self.page_numbers)}\n'
-        text += f'{5*"-"} Assigned according to index: {self.page_numbers}\n'
-        text += f'{5*"-"} Missing pages: {self.get_not_found_pages()}\n'
-        text += f'{5*"-"}'.join(self.errors)
+    def iter_text(self) -> Iterator[str]:
+        """Yields the text of the article (see `get_text`) in chunks, page texts are yielded as they are"""
+        yield f'{5*"-"} Title according to index: {self.catalogue_title}\n'
+        yield f'{5*"-"} Pages according to index: {",".join(str(x) for x in self.page_numbers)}\n'
+        yield f'{5*"-"} Assigned according to index: {self.page_numbers}\n'
+        yield f'{5*"-"} Missing pages: {self.get_not_found_pages()}\n'
+        yield f'{5*"-"}'.join(self.errors)
         for page_number, page_text in self.texts:
-            text += f'\n{20*"-"} Page {page_number} {20*"-"}\n\n{page_text}\n'
-        return text
+            yield f'\n{20*"-"} Page {page_number} {20*"-"}\n\n'
+            yield page_text
+            yield '\n'
+
+    def write_text(self, fp: TextIO) -> None:
+        """Writes the text of the article to `fp` without assembling it in memory"""
+        fp.writelines(self.iter_text())
+
+    def get_text(self) -> str:
+        return ''.join(self.iter_text())
 
     def get_assigned_pages(self) -> Set[int]:
         return {p[0] for p in self.texts}
 
     def get_not_found_pages(self) -> Set[int]:
-        return {x for x in self.page_numbers if x not in self.get_assigned_pages()}
+        assigned_pages: Set[int] = self.get_assigned_pages()
+        return {x for x in self.page_numbers if x not in assigned_pages}
 
 
 class CourierIssue:
-    def __init__(self, courier_id: str):
+    """An issue of the Courier and its articles.
+
+    Content is loaded by `content_loader` (default `get_issue_content`) the first time a page is accessed,
+    and pages are created one at a time as they are needed.
+    """
+
+    __slots__ = (
+        'courier_id',
+        'articles',
+        'page_number_mapping',
+        '_pdf_double_page_numbers',
+        'double_pages',
+        '_content_loader',
+        '_content',
+        '_pages',
+    )
+
+    def __init__(self, courier_id: str, content_loader: Optional[Callable[[str], ExtractedIssue]] = None):
 
         self.courier_id = courier_id
 
         if len(courier_id) != 6:
             raise ValueError(f'Not a valid courier id "{courier_id}')
 
-        if courier_id not in CONFIG.article_index.courier_id.values:
+        if courier_id not in CONFIG.courier_ids:
             raise ValueError(f'{courier_id} not in article index')
 
         self.articles: List[Article] = self._get_articles()
-        self.content: ExtractedIssue = get_pdf_issue_content(courier_id)
 
-        self._pdf_double_page_numbers: List[int] = CONFIG.double_pages.get(courier_id, [])
+        self.page_number_mapping: PageNumberMapping = CONFIG.get_page_number_mapping(courier_id)
+        self._pdf_double_page_numbers: List[int] = list(self.page_number_mapping.pdf_double_page_numbers)
+
+        self.double_pages: List[int] = list(self.page_number_mapping.double_pages)
+
+        self._content_loader: Callable[[str], ExtractedIssue] = content_loader or get_issue_content
+        self._content: Optional[ExtractedIssue] = None
+        self._pages: Optional[List[Optional[Page]]] = None
+
+    @property
+    def content(self) -> ExtractedIssue:
+        if self._content is None:
+            self._content = self._content_loader(self.courier_id)
+        return self._content
 
-        self.double_pages: List[int] = [x + i for i, x in enumerate(self._pdf_double_page_numbers)]
-        self.pages: List[Page] = PagesFactory().create(self)
+    @property
+    def is_loaded(self) -> bool:
+        return self._content is not None
+
+    @property
+    def pages(self) -> List[Page]:
+        return [self[index] for index in range(len(self))]
 
     def to_pdf_page_number(self, page_number: int) -> int:
-        _pdf_page_number = page_number - 1 - len([x for x in self.double_pages if x < page_number])
-        return _pdf_page_number
+        return self.page_number_mapping.to_pdf_page_number(page_number)
 
     def get_article(self, record_number: str) -> Optional[Article]:
         return next((x for x in self.articles if x.record_number == record_number), None)
@@ -178,10 +292,15 @@ class CourierIssue:
         return len(self.articles)
 
     def __len__(self) -> int:
-        return len(self.pages)
+        return self.page_number_mapping.num_pages(len(self.content.pages))
 
     def __getitem__(self, index: int) -> Page:
-        return self.pages[index]
+        if self._pages is None:
+            self._pages = [None] * len(self)
+        page: Optional[Page] = self._pages[index]
+        if page is None:
+            page = self._pages[index] = PagesFactory().create_page(self, range(1, len(self) + 1)[index])
+        return page
 
     def get_page(self, page_number: int) -> Page:
         return self[page_number - 1]
@@ -215,42 +334,48 @@ class CourierIssue:
 class PagesFactory:
     def create(self, issue: CourierIssue) -> List[Page]:
         """Returns extracted page content"""
-        num_pages = len(issue.content.pages) + len(issue.double_pages)
-
-        pages = [
-            DoubleSpreadRightPage(page_number)
-            if page_number - 1 in issue.double_pages
-            else Page(
-                page_number=page_number,
-                text=issue.content.pages[issue.to_pdf_page_number(page_number)].content,
-                titles=issue.content.pages[issue.to_pdf_page_number(page_number)].titles,
-            )
-            for page_number in range(1, num_pages + 1)
-        ]
+        num_pages = issue.page_number_mapping.num_pages(len(issue.content.pages))
+        pages = [self.create_page(issue, page_number) for page_number in range(1, num_pages + 1)]
         return pages
 
+    def create_page(self, issue: CourierIssue, page_number: int) -> Page:
+        mapping: PageNumberMapping = issue.page_number_mapping
+        if mapping.is_double_spread_right(page_number):
+            return DoubleSpreadRightPage(page_number)
+        content: ExtractedPage = issue.content.pages[mapping.to_pdf_page_number(page_number)]
+        return Page(page_number=page_number, text=content.content, titles=content.titles)
+
 
 class AssignArticlesToPages:
     def assign(self, issue: CourierIssue) -> None:
         if issue.get_assigned_pages():
             warnings.warn(f'Pages already assigned to {issue.courier_id}', stacklevel=2)
             return
+        article_pages: PageIntervalIndex = self._get_article_pages(issue)
         for page in issue.pages:
             if isinstance(page, DoubleSpreadRightPage):
                 continue
-            articles: List[Article] = self._find_articles_on_page(issue, page)
+            articles: List[Article] = self._find_articles_on_page(issue, page, article_pages)
             page.articles = articles
             for article in articles:
                 article.pages.append(page)
 
-    def _find_articles_on_page(self, issue: CourierIssue, page: Page) -> List[Article]:
-        articles = [
-            a for a in issue.articles if page.page_number in a.page_numbers
-        ]  # FIXME: Handle that a.page_numbers can be None
+    def _get_article_pages(self, issue: CourierIssue) -> PageIntervalIndex:
+        # FIXME: Handle that a.page_numbers can be None
+        return PageIntervalIndex([a.page_numbers for a in issue.articles])
+
+    def _find_articles_on_page(
+        self, issue: CourierIssue, page: Page, article_pages: Optional[PageIntervalIndex] = None
+    ) -> List[Article]:
+        article_pages = self._get_article_pages(issue) if article_pages is None else article_pages
+        articles = [issue.articles[position] for position in article_pages.query(page.page_number)]
         return articles
 
 
 class ConsolidateArticleTexts:
+    def __init__(self, title_matcher: Optional[TitleMatcher] = None):
+        self.title_matcher: TitleMatcher = title_matcher or TitleMatcher()
+
     def consolidate(self, issue: CourierIssue) -> None:
         for article in issue.articles:
             for page in article.pages:
@@ -303,16 +428,11 @@ class ConsolidateArticleTexts:
             article.errors.append(f'Unhandled page {page.page_number}. More than two articles on page.')
 
     # NOTE: Main logic
-    def find_matching_title_position(self, article: Article, titles: List) -> Optional[int]:
+    def find_matching_title_position(self, article: Article, titles: List[Tuple[int, str]]) -> Optional[int]:
         if article.catalogue_title is None:
             return None
-        title_bow: Set[str] = set(article.catalogue_title.lower().split())
-        for position, candidate_title in titles:
-            candidate_title_bow: Set[str] = set(candidate_title.lower().split())
-            common_words = title_bow.intersection(candidate_title_bow)
-            if len(common_words) >= 2 and len(common_words) >= len(title_bow) / 2:
-                return position
-        return None
+        match: Optional[TitleMatch] = self.title_matcher.match(article.catalogue_title, titles)
+        return None if match is None else match.position
 
 
 @dataclass
@@ -348,6 +468,15 @@ class IssueStatistics:
         """Number of articles in issue"""
         return self.issue.num_articles
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'courier_id': self.issue.courier_id,
+            'total_pages': self.total_pages,
+            'assigned_pages': self.assigned_pages,
+            'expected_article_pages': self.expected_article_pages,
+            'number_of_articles': self.number_of_articles,
+        }
+
 
 class ExtractArticles:
     @staticmethod
@@ -361,12 +490,17 @@ class ExtractArticles:
         return IssueStatistics(issue)
 
 
-# TODO: Add logging and skip completed. See extract.interface.ITextExtractor.batch_extract
+def get_article_filename(courier_id: Optional[str], record_number: Optional[int], catalogue_title: str) -> str:
+    safe_title = re.sub(r'[^\w]+', '_', str(catalogue_title).lower())
+    return f'{courier_id}_{record_number}_{safe_title[:60]}.txt'
+
+
 def export_articles(
     courier_id: str,
-    export_folder: Union[str, os.PathLike] = CONFIG.articles_dir / 'exported',
-) -> None:
+    export_folder: Optional[Union[str, os.PathLike]] = None,
+) -> IssueStatistics:
 
+    export_folder = export_folder or CONFIG.articles_dir / 'exported'
     issue = CourierIssue(courier_id)
     ExtractArticles.extract(issue)
     issue_statistics = ExtractArticles.statistics(issue)
@@ -379,23 +513,126 @@ def export_articles(
     Path(export_folder).mkdir(parents=True, exist_ok=True)
 
     for article in issue.articles:
-        if article.catalogue_title is None:
+        if not article.catalogue_title:
             continue
-        safe_title = re.sub(r'[^\w]+', '_', str(article.catalogue_title).lower())
-        file = Path(export_folder) / f'{article.courier_id}_{article.record_number}_{safe_title[:60]}.txt'
+        file = Path(export_folder) / get_article_filename(
+            article.courier_id, article.record_number, article.catalogue_title
+        )
         with open(file, 'w') as fp:
-            fp.write(article.get_text())
+            article.write_text(fp)
+
+    return issue_statistics
+
+
+def is_export_up_to_date(courier_id: str, export_folder: Union[str, os.PathLike]) -> bool:
+    """Returns True if all article files of the issue exist and are newer than the issue's source files"""
+    # Articles without a title are not exported, see `export_articles`
+    files = [
+        Path(export_folder) / get_article_filename(courier_id, article['record_number'], article['catalogue_title'])
+        for article in CONFIG.get_issue_article_index(courier_id)
+        if article['catalogue_title']
+    ]
+    if not files or not all(file.exists() for file in files):
+        return False
+    sources = [CONFIG.metadata_file, CONFIG.double_pages_file, *CONFIG.pdf_dir.glob(f'{courier_id}*.pdf')]
+    source_mtime = max((source.stat().st_mtime for source in sources if source.exists()), default=0.0)
+    return min(file.stat().st_mtime for file in files) >= source_mtime
+
+
+def _export_issue(courier_id: str, export_folder: Union[str, os.PathLike]) -> Dict[str, Any]:
+    """Exports one issue, errors are returned instead of raised so that one issue can't stop the export"""
+    try:
+        return {**export_articles(courier_id, export_folder).to_dict(), 'status': 'exported', 'error': ''}
+    except Exception as e:  # pylint: disable=broad-except
+        logger.exception(f'Export of {courier_id} failed')
+        return {'courier_id': courier_id, 'status': 'failed', 'error': repr(e)}
+
+
+def export_corpus(
+    courier_ids: Optional[List[str]] = None,
+    export_folder: Optional[Union[str, os.PathLike]] = None,
+    statistics_file: Optional[Union[str, os.PathLike]] = None,
+    processes: Optional[int] = None,
+    force: bool = False,
+) -> pd.DataFrame:
+    """Exports the articles of all issues (or `courier_ids`) in parallel, and writes a summary of their statistics.
+
+    Args:
+        courier_ids (Optional[List[str]], optional): Issues to export. Defaults to all issues with a PDF-file.
+        export_folder (Optional[Union[str, os.PathLike]], optional): Output folder. Defaults to articles_dir/exported.
+        statistics_file (Optional[Union[str, os.PathLike]], optional): Summary CSV-file. Defaults to
+            issue_statistics.csv in `export_folder`.
+        processes (Optional[int], optional): Number of worker processes, 1 exports in the current process.
+            Defaults to the number of CPUs.
+        force (bool, optional): Export also issues whose article files are up to date. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Statistics of every issue, with its status ("exported", "skipped" or "failed")
+    """
+    export_folder = Path(export_folder or CONFIG.articles_dir / 'exported')
+    statistics_file = Path(statistics_file or export_folder / 'issue_statistics.csv')
+    courier_ids = courier_ids or [x[:6] for x in get_courier_ids()]
+
+    # Statistics of skipped issues are carried over from the previous summary
+    previous: Dict[str, Dict[str, Any]] = {}
+    if statistics_file.exists():
+        previous = {
+            row['courier_id']: row
+            for row in pd.read_csv(statistics_file, sep='\t', dtype={'courier_id': str}).to_dict('records')
+        }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    pending: List[str] = []
+    for courier_id in courier_ids:
+        if courier_id not in CONFIG.courier_ids:
+            logger.warning(f'{courier_id} not in article index')
+        elif not force and is_export_up_to_date(courier_id, export_folder):
+            results[courier_id] = {**previous.get(courier_id, {'courier_id': courier_id}), 'status': 'skipped'}
+        else:
+            pending.append(courier_id)
+
+    logger.info(f'Exporting {len(pending)} issues, skipping {len(results)} up-to-date issues')
+    if processes == 1:
+        results.update({courier_id: _export_issue(courier_id, export_folder) for courier_id in pending})
+    else:
+        # Workers are spawned, not forked, since JPype can't be used in a process forked after the JVM started
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {executor.submit(_export_issue, courier_id, export_folder): courier_id for courier_id in pending}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    columns = [
+        'courier_id',
+        'status',
+        'total_pages',
+        'assigned_pages',
+        'expected_article_pages',
+        'number_of_articles',
+        'error',
+    ]
+    statistics = pd.DataFrame([results[x] for x in courier_ids if x in results], columns=columns)
+    statistics_file.parent.mkdir(parents=True, exist_ok=True)
+    statistics.to_csv(statistics_file, sep='\t', index=False)
+
+    failed = (statistics.status == 'failed').sum()
+    if failed:
+        logger.warning(f'Export of {failed} issues failed, see {statistics_file}')
+    return statistics
+
+
+@argh.arg('--courier-ids', nargs='+')
+@argh.arg('--processes', type=int)
+def main(
+    courier_ids: Optional[List[str]] = None,
+    export_folder: Optional[Union[str, os.PathLike]] = None,
+    statistics_file: Optional[Union[str, os.PathLike]] = None,
+    processes: Optional[int] = None,
+    force: bool = False,
+) -> None:
+    """Exports the articles of all issues (or `courier_ids`), see `export_corpus`"""
+    statistics = export_corpus(courier_ids, export_folder, statistics_file, processes, force)
+    logger.info(f'Export done: {statistics.status.value_counts().to_dict()}')
 
 
 if __name__ == '__main__':
-    courier_ids = [x[:6] for x in get_courier_ids()]
-    for courier_id in courier_ids:
-        if courier_id not in CONFIG.article_index.courier_id.values:
-            print(f'{courier_id} not in article index')
-            continue
-        export_articles(courier_id)
-
-    # export_articles('014255')
-    # export_articles('015480')
-    # export_articles('074873')
-    # export_articles('098493')
+    argh.dispatch_command(main)
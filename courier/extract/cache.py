@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from loguru import logger
+
+from courier.extract.java_extractor import ExtractedIssue, ExtractedPage
+from courier.extract.utils import file_hash
+
+
+class ExtractedIssueCache:
+    """Sidecar cache for `ExtractedIssue`s, stored as gzipped JSON next to the source PDF-file.
+
+    An entry is valid only if both the hash of the PDF-file and the extractor parameters match the ones it was
+    created with, e.g. `012656engo.pdf` is cached in `012656engo.extracted.json.gz`.
+    """
+
+    version: int = 1
+    suffix: str = '.extracted.json.gz'
+
+    def __init__(self, parameters: Dict[str, Any]):
+        self.parameters: Dict[str, Any] = parameters
+
+    def filename(self, pdf_filename: Union[str, os.PathLike]) -> Path:
+        return Path(pdf_filename).with_suffix(self.suffix)
+
+    def key(self, pdf_filename: Union[str, os.PathLike]) -> Dict[str, Any]:
+        return {'version': self.version, 'sha1': file_hash(pdf_filename), 'parameters': self.parameters}
+
+    def load(self, pdf_filename: Union[str, os.PathLike]) -> Optional[ExtractedIssue]:
+        """Returns the cached issue for `pdf_filename`, or None if there is no valid cache entry"""
+        cache_file = self.filename(pdf_filename)
+        if not cache_file.exists():
+            return None
+        try:
+            with gzip.open(cache_file, 'rt', encoding='utf-8') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable cache file {cache_file}: {e}')
+            return None
+        if data.get('key') != self.key(pdf_filename):
+            return None
+        pages = [
+            ExtractedPage(
+                pdf_page_number=pdf_page_number,
+                content=content,
+                titles=[(title, position) for title, position in titles],
+            )
+            for pdf_page_number, content, titles in data['pages']
+        ]
+        return ExtractedIssue(pages=pages)
+
+    def store(self, pdf_filename: Union[str, os.PathLike], issue: ExtractedIssue) -> None:
+        cache_file = self.filename(pdf_filename)
+        data = {
+            'key': self.key(pdf_filename),
+            'pages': [
+                [
+                    page.pdf_page_number,
+                    str(page.content),
+                    [[str(title), int(position)] for title, position in page.titles],
+                ]
+                for page in issue.pages
+            ],
+        }
+        tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+        try:
+            with gzip.open(tmp_file, 'wt', encoding='utf-8') as fp:
+                json.dump(data, fp, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f'Unable to write cache file {cache_file}: {e}')
@@ -4,7 +4,7 @@
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import jpype
 import jpype.imports
@@ -14,21 +14,24 @@ from courier.config import get_config
 
 CONFIG = get_config()
 
-# FIXME: Cleanup
-# pdfcourier2text_path = CONFIG.project_root / 'courier/lib/pdfbox-app-3.0.0-SNAPSHOT.jar'
-cache_dir = Path(AppDirs('python-pdfbox').user_cache_dir)
-pdfbox_path = list(cache_dir.glob('pdfbox-app-*.jar'))[-1]
-# FIXME: Create repo for pdfextract
-pdfcourier2text_path = CONFIG.project_root / 'courier/lib/pdfextract-1.0-SNAPSHOT.jar'
 
-# FIXME: Move to JavaExtractor class, add java args as option, add class paths at appropriate places, rename alias in 'import as'
-if not jpype.isJVMStarted():
-    jpype.addClassPath(pdfbox_path)
-    jpype.addClassPath(pdfcourier2text_path)
-    # jpype.startJVM(convertStrings=False)
-    jpype.startJVM('-Dorg.apache.commons.logging.Log=org.apache.commons.logging.impl.NoOpLog', convertStrings=False)
-# import org.apache.pdfbox.tools as pdfbox_tools  # isort: skip  # noqa: E402
-import se.umu.humlab.pdfextract as pdfbox_tools  # isort: skip  # noqa: E402
+def start_jvm() -> Any:
+    """Starts the JVM (once per process) and returns the `se.umu.humlab.pdfextract` Java package."""
+    # FIXME: Cleanup
+    # pdfcourier2text_path = CONFIG.project_root / 'courier/lib/pdfbox-app-3.0.0-SNAPSHOT.jar'
+    if not jpype.isJVMStarted():
+        cache_dir = Path(AppDirs('python-pdfbox').user_cache_dir)
+        pdfbox_path = list(cache_dir.glob('pdfbox-app-*.jar'))[-1]
+        # FIXME: Create repo for pdfextract
+        pdfcourier2text_path = CONFIG.project_root / 'courier/lib/pdfextract-1.0-SNAPSHOT.jar'
+        jpype.addClassPath(pdfbox_path)
+        jpype.addClassPath(pdfcourier2text_path)
+        # jpype.startJVM(convertStrings=False)
+        jpype.startJVM('-Dorg.apache.commons.logging.Log=org.apache.commons.logging.impl.NoOpLog', convertStrings=False)
+    # import org.apache.pdfbox.tools as pdfbox_tools
+    import se.umu.humlab.pdfextract as pdfbox_tools  # pylint: disable=import-outside-toplevel
+
+    return pdfbox_tools
 
 
 @dataclass
@@ -56,10 +59,29 @@ class ExtractedIssue:
 
 
 # TODO: Use this in `pdfbox_extractor` or new `custom_pdfbox_extractor`
-# TODO: Add parameters `titleFontSizeInPt`, `minTitleLengthInCharacters`
 class JavaExtractor:
-    def __init__(self) -> None:
-        self.extractor = pdfbox_tools.PDFCourier2Text(5.5, 8)
+    def __init__(self, title_font_size_in_pt: float = 5.5, min_title_length_in_characters: int = 8) -> None:
+        self.title_font_size_in_pt: float = title_font_size_in_pt
+        self.min_title_length_in_characters: int = min_title_length_in_characters
+        self._extractor: Optional[Any] = None
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Parameters passed to `PDFCourier2Text`, i.e. everything (besides the PDF) that affects the output"""
+        return {
+            'title_font_size_in_pt': self.title_font_size_in_pt,
+            'min_title_length_in_characters': self.min_title_length_in_characters,
+        }
+
+    @property
+    def extractor(self) -> Any:
+        """The Java `PDFCourier2Text` instance. The JVM is not started until this is first accessed."""
+        if self._extractor is None:
+            pdfbox_tools = start_jvm()
+            self._extractor = pdfbox_tools.PDFCourier2Text(
+                self.title_font_size_in_pt, self.min_title_length_in_characters
+            )
+        return self._extractor
 
     def extract_issue(self, filename: Union[str, os.PathLike]) -> ExtractedIssue:
         filename = str(filename)
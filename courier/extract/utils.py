@@ -1,3 +1,4 @@
+import hashlib
 import os
 from pathlib import Path
 from typing import List, Union
@@ -13,5 +14,14 @@ def get_filenames(files: Union[str, os.PathLike], extension: str = 'pdf') -> Lis
     return items
 
 
+def file_hash(filename: Union[str, os.PathLike], chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-1 hex digest of the content of `filename`"""
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 if __name__ == '__main__':
     pass
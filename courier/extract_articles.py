@@ -1,7 +1,8 @@
-import glob
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Optional, Union
 
 import argh
 import pandas as pd
@@ -11,71 +12,127 @@ from tqdm import tqdm
 
 from courier.article_index import article_index_to_csv
 from courier.config import get_config
+from courier.directory_index import DirectoryIndex
 from courier.elements import CourierIssue
 from courier.utils import cdata, valid_xml
 
 CONFIG = get_config()
 
 
-jinja_env = Environment(
-    loader=PackageLoader('courier', 'templates'),
-    autoescape=select_autoescape(['html', 'xml']),
-    trim_blocks=True,
-    lstrip_blocks=True,
-)
-jinja_env.filters['valid_xml'] = valid_xml
-jinja_env.filters['cdata'] = cdata
+def create_jinja_env() -> Environment:
+    env = Environment(
+        loader=PackageLoader('courier', 'templates'),
+        autoescape=select_autoescape(['html', 'xml']),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    env.filters['valid_xml'] = valid_xml
+    env.filters['cdata'] = cdata
+    return env
+
+
+jinja_env: Environment = create_jinja_env()
+
+
+def get_template_names(template_name: Optional[Union[str, List[str]]] = None) -> List[str]:
+    if template_name is None:
+        return [CONFIG.default_template]
+    if isinstance(template_name, str):
+        return [template_name]
+    return list(template_name)
 
 
 def extract_articles_from_issue(
     courier_issue: CourierIssue,
-    template_name: str = CONFIG.default_template,
-    extract_folder: Union[str, os.PathLike] = CONFIG.articles_dir,
+    template_name: Optional[Union[str, List[str]]] = None,
+    extract_folder: Optional[Union[str, os.PathLike]] = None,
 ) -> None:
+    """Renders the articles of `courier_issue` with each template in `template_name` (a name or a list of names).
 
-    template = jinja_env.get_template(template_name)
-    ext = template_name.split('.')[-2]
-
-    extract_folder = Path(extract_folder) / ext
-    Path(extract_folder).mkdir(parents=True, exist_ok=True)
-
-    for i, article in enumerate(courier_issue.articles, 1):
-        article_text = template.render(article=article)
-        with open(Path(extract_folder / f'{article.courier_id}_{i:02}_{article.record_number}.{ext}'), 'w') as fp:
-            fp.write(article_text)
+    Output of a template is written to a folder named by the template's extension, e.g. "xml" for
+    "article.xml.jinja".
+    """
 
+    extract_folder = extract_folder or CONFIG.articles_dir
 
-def extract_articles(
-    input_folder: Union[str, os.PathLike] = CONFIG.xml_dir,
-    article_index: pd.DataFrame = CONFIG.article_index,
-    template_name: str = CONFIG.default_template,
-    output_folder: Union[str, os.PathLike] = CONFIG.articles_dir,
-) -> None:
+    for name in get_template_names(template_name):
+        template = jinja_env.get_template(name)
+        ext = name.split('.')[-2]
 
-    missing = set()
+        template_folder = Path(extract_folder) / ext
+        Path(template_folder).mkdir(parents=True, exist_ok=True)
 
-    for courier_id in tqdm(article_index['courier_id'].unique(), desc=f'Extracting {template_name.split(".")[-2]}'):
+        for i, article in enumerate(courier_issue.articles, 1):
+            article_text = template.render(article=article)
+            with open(Path(template_folder / f'{article.courier_id}_{i:02}_{article.record_number}.{ext}'), 'w') as fp:
+                fp.write(article_text)
 
-        filename_pattern = os.path.join(input_folder, f'{courier_id}eng*.xml')
-        filename = glob.glob(filename_pattern)
 
-        if len(filename) == 0:
-            missing.add(courier_id)
-            logger.warning(f'No match found for {courier_id}')
-            continue
+def _extract_issue(
+    courier_id: str,
+    template_names: List[str],
+    extract_folder: Union[str, os.PathLike],
+) -> None:
+    extract_articles_from_issue(
+        courier_issue=CourierIssue(courier_id),
+        template_name=template_names,
+        extract_folder=extract_folder,
+    )
 
-        if len(filename) > 1:
-            logger.warning(f'Duplicate matches for: {courier_id}: {", ".join([f.split("/")[-1] for f in filename])}')
-            continue
 
-        extract_articles_from_issue(
-            courier_issue=CourierIssue(courier_id),
-            template_name=template_name,
-            extract_folder=output_folder,
-        )
+@argh.arg('-t', '--template-name', nargs='+')
+def extract_articles(
+    input_folder: Optional[Union[str, os.PathLike]] = None,
+    article_index: Optional[pd.DataFrame] = None,
+    template_name: Optional[Union[str, List[str]]] = None,
+    output_folder: Optional[Union[str, os.PathLike]] = None,
+    workers: int = 1,
+) -> None:
+    """Extracts the articles of all issues in `article_index` that have exactly one XML-file in `input_folder`.
+
+    Each issue is loaded once and rendered with all templates in `template_name` (a name or a list of names).
+    If `workers` > 1, issues are extracted in a pool of `workers` processes, one issue at a time per worker.
+    """
+
+    input_folder = input_folder or CONFIG.xml_dir
+    article_index = CONFIG.article_index if article_index is None else article_index
+    template_names: List[str] = get_template_names(template_name)
+    output_folder = output_folder or CONFIG.articles_dir
+
+    # Scan the input folder once, instead of a glob per issue
+    directory_index = DirectoryIndex(input_folder)
+    courier_ids: List[str] = list(article_index['courier_id'].unique())
+    filenames: Dict[str, List[Path]] = {
+        courier_id: directory_index.files(f'{courier_id}eng', '.xml') for courier_id in courier_ids
+    }
+    missing, duplicates = DirectoryIndex.missing_and_duplicates(filenames)
+    pending: List[str] = [courier_id for courier_id, files in filenames.items() if len(files) == 1]
+
+    for courier_id in missing:
+        logger.warning(f'No match found for {courier_id}')
+
+    for courier_id in duplicates:
+        logger.warning(f'Duplicate matches for: {courier_id}: {", ".join(f.name for f in filenames[courier_id])}')
+
+    desc = f'Extracting {", ".join(name.split(".")[-2] for name in template_names)}'
+    if workers == 1:
+        for courier_id in tqdm(pending, desc=desc):
+            _extract_issue(courier_id, template_names, output_folder)
+    else:
+        # Workers are spawned, not forked, since JPype can't be used in a process forked after the JVM started.
+        # Each worker imports this module, and so creates its own Jinja environment.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                executor.submit(_extract_issue, courier_id, template_names, output_folder) for courier_id in pending
+            ]
+            for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                future.result()
 
     if len(missing) != 0:  # pragma: no cover
-        logger.warning('Missing courier_ids: ', *missing)
+        logger.warning(f'Missing courier_ids: {", ".join(sorted(missing))}')
+
+    if len(duplicates) != 0:
+        logger.warning(f'Duplicate courier_ids: {", ".join(sorted(duplicates))}')
 
     article_index_to_csv(article_index, output_folder)
 
@@ -0,0 +1,105 @@
+import sys
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from loguru import logger
+
+from courier.elements import CourierIssue, Page
+
+_issue_cache = None
+
+
+def get_issue_size(issue: CourierIssue) -> int:
+    """Returns the approximate size in bytes of the content loaded by `issue`"""
+    if not issue.is_loaded:
+        return 0
+    return sum(
+        sys.getsizeof(page.content) + sum(sys.getsizeof(title) for title, _ in page.titles)
+        for page in issue.content.pages
+    )
+
+
+class IssueCache:
+    """LRU cache of `CourierIssue`s, bounded by number of issues and by the size of their loaded content.
+
+    The size of an issue is measured once, after its content has been loaded. Use `get_page` to access pages,
+    so that the bounds are enforced as soon as content is loaded. Cached issues are shared, use them for
+    read-only analysis only, e.g. not for assigning articles to pages.
+    """
+
+    def __init__(self, max_issues: int = 32, max_bytes: int = 256 * 1024 * 1024):
+        self.max_issues: int = max_issues
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self._issues: 'OrderedDict[str, CourierIssue]' = OrderedDict()
+        # Size of each issue's content, None until the content is loaded
+        self._sizes: Dict[str, Optional[int]] = {}
+        self._nbytes: int = 0
+
+    def get(self, courier_id: str) -> CourierIssue:
+        issue: Optional[CourierIssue] = self._issues.get(courier_id)
+        if issue is not None:
+            self.hits += 1
+            self._issues.move_to_end(courier_id)
+            return issue
+        self.misses += 1
+        self._evict(reserve=1)
+        issue = self._issues[courier_id] = CourierIssue(courier_id)
+        self._sizes[courier_id] = None
+        return issue
+
+    def get_page(self, courier_id: str, page_number: int) -> Page:
+        """Returns page `page_number` of the issue, and evicts other issues if loading it exceeded the bounds"""
+        page: Page = self.get(courier_id).get_page(page_number)
+        self._evict()
+        return page
+
+    def _measure(self) -> None:
+        """Measures issues whose content has been loaded since they were added"""
+        for courier_id, size in self._sizes.items():
+            if size is None and self._issues[courier_id].is_loaded:
+                size = self._sizes[courier_id] = get_issue_size(self._issues[courier_id])
+                self._nbytes += size
+
+    def _evict(self, reserve: int = 0) -> None:
+        """Removes least recently used issues until there is room for `reserve` more issues.
+
+        The most recently used issue is kept unless room is reserved for another issue, even if it exceeds
+        `max_bytes` by itself.
+        """
+        self._measure()
+        while len(self._issues) > (0 if reserve else 1) and (
+            len(self._issues) + reserve > self.max_issues or self._nbytes > self.max_bytes
+        ):
+            courier_id, _ = self._issues.popitem(last=False)
+            self._nbytes -= self._sizes.pop(courier_id) or 0
+            logger.debug(f'Evicted {courier_id} from issue cache')
+
+    @property
+    def nbytes(self) -> int:
+        self._measure()
+        return self._nbytes
+
+    def clear(self) -> None:
+        self._issues.clear()
+        self._sizes.clear()
+        self._nbytes = 0
+        self.hits = self.misses = 0
+
+    def log_statistics(self) -> None:
+        logger.info(f'Issue cache: {self.hits} hits, {self.misses} misses, {len(self)} issues ({self.nbytes} bytes)')
+
+    def __contains__(self, courier_id: str) -> bool:
+        return courier_id in self._issues
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+
+def get_issue_cache() -> IssueCache:
+    """Returns the issue cache shared by analysis entry points"""
+    global _issue_cache
+    if _issue_cache is None:
+        _issue_cache = IssueCache()
+    return _issue_cache
@@ -0,0 +1,112 @@
+import json
+import mmap
+import os
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+# A page element as written by the `courier_issue.xml` template. The content of a page is one or more CDATA
+# sections, an escaped "]]>" in the content is always followed by a new CDATA section, never by "</page>".
+PAGE_PATTERN = re.compile(rb'<page number="(\d+)">(\s*<!\[CDATA\[.*?\]\]>\s*)</page>', re.DOTALL)
+
+
+class PageOffsetIndex:
+    """Byte ranges of the page contents in a compiled issue XML-file, stored in a sidecar JSON-file.
+
+    An index is valid only as long as the size and modification time of the XML-file are unchanged, e.g.
+    `012656engo.xml` is indexed in `012656engo.offsets.json`.
+    """
+
+    version: int = 1
+    suffix: str = '.offsets.json'
+
+    def __init__(self, offsets: Dict[int, Tuple[int, int]]):
+        self.offsets: Dict[int, Tuple[int, int]] = offsets
+
+    @classmethod
+    def filename(cls, xml_filename: Union[str, os.PathLike]) -> Path:
+        return Path(xml_filename).with_suffix(cls.suffix)
+
+    @classmethod
+    def key(cls, xml_filename: Union[str, os.PathLike]) -> Dict[str, int]:
+        stat = os.stat(xml_filename)
+        return {'version': cls.version, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    @classmethod
+    def scan(cls, data: Union[bytes, mmap.mmap]) -> 'PageOffsetIndex':
+        """Returns the index of the pages in `data`, the bytes of a compiled issue XML-file"""
+        return cls({int(m.group(1)): (m.start(2), m.end(2)) for m in PAGE_PATTERN.finditer(data)})
+
+    @classmethod
+    def create(cls, xml_filename: Union[str, os.PathLike]) -> 'PageOffsetIndex':
+        if os.path.getsize(xml_filename) == 0:
+            return cls({})
+        with open(xml_filename, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return cls.scan(data)
+
+    @classmethod
+    def load(cls, xml_filename: Union[str, os.PathLike]) -> Optional['PageOffsetIndex']:
+        """Returns the stored index of `xml_filename`, or None if there is no valid index"""
+        index_file = cls.filename(xml_filename)
+        if not index_file.exists():
+            return None
+        try:
+            with open(index_file, 'r', encoding='utf-8') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable offset index {index_file}: {e}')
+            return None
+        if data.get('key') != cls.key(xml_filename):
+            return None
+        return cls({int(page_number): (start, end) for page_number, start, end in data['pages']})
+
+    def store(self, xml_filename: Union[str, os.PathLike]) -> None:
+        index_file = self.filename(xml_filename)
+        data = {
+            'key': self.key(xml_filename),
+            'pages': [[page_number, start, end] for page_number, (start, end) in sorted(self.offsets.items())],
+        }
+        # Write to a temporary file first, so that an interrupted write never leaves a truncated index
+        tmp_file = index_file.with_name(f'{index_file.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as fp:
+                json.dump(data, fp, separators=(',', ':'))
+            os.replace(tmp_file, index_file)
+        except OSError as e:
+            logger.warning(f'Unable to write offset index {index_file}: {e}')
+            tmp_file.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+class IssueXMLReader:
+    """Random access to the pages of a compiled issue XML-file.
+
+    Uses the file's `PageOffsetIndex` (created if missing or stale) to read only the bytes of the requested page,
+    only that page is parsed.
+    """
+
+    def __init__(self, filename: Union[str, os.PathLike]):
+        self.filename: Path = Path(filename)
+        self.index: PageOffsetIndex = PageOffsetIndex.load(filename) or PageOffsetIndex.create(filename)
+
+    @property
+    def page_numbers(self) -> List[int]:
+        return sorted(self.index.offsets)
+
+    def read_page(self, page_number: int) -> str:
+        """Returns the text of `page_number`, as in `elements.iter_xml_pages`"""
+        if page_number not in self.index.offsets:
+            raise KeyError(f'Page {page_number} not in {self.filename}')
+        start, end = self.index.offsets[page_number]
+        with open(self.filename, 'rb') as fp:
+            fp.seek(start)
+            content: bytes = fp.read(end - start)
+        return ET.fromstring(b'<page>' + content + b'</page>').text or ''
+
+    def __len__(self) -> int:
+        return len(self.index)
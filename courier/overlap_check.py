@@ -1,30 +1,31 @@
 import csv
 import os
-from typing import Union
+from typing import Optional, Union
 
 import pandas as pd
 
 from courier.config import get_config
+from courier.page_index import PageIndex
 
 CONFIG = get_config()
 
 
+def get_page_index(article_index: pd.DataFrame) -> PageIndex:
+    """Returns the shared page index for the configured article index, otherwise builds one"""
+    # Compare with the loaded index only, so that a custom index never loads the configured one
+    if article_index is CONFIG._article_index:  # pylint: disable=protected-access
+        return CONFIG.page_index
+    return PageIndex(article_index)
+
+
 def get_overlapping_pages(article_index: pd.DataFrame) -> pd.DataFrame:
-    df_pages = article_index[['courier_id', 'record_number', 'pages']].explode('pages')
-    df_pages['courier_id'] = df_pages.courier_id.astype('int')
-    page_count = df_pages.groupby(['courier_id', 'pages']).size()
-    page_count = page_count.reset_index()
-    page_count.columns = ['courier_id', 'pages', 'count']
-    overlapping_pages = page_count[page_count['count'] > 1]
-    overlapping_pages = overlapping_pages.rename(columns={'pages': 'page'})
-    overlapping_pages = overlapping_pages.reset_index(drop=True)
-    return overlapping_pages
+    return get_page_index(article_index).overlapping_pages()
 
 
 def save_overlapping_pages(
-    overlap_df: pd.DataFrame, output_filename: Union[str, bytes, os.PathLike] = CONFIG.overlap_file
+    overlap_df: pd.DataFrame, output_filename: Optional[Union[str, bytes, os.PathLike]] = None
 ) -> None:
-    overlap_df.to_csv(output_filename, sep='\t', index=False, quoting=csv.QUOTE_NONNUMERIC)
+    overlap_df.to_csv(output_filename or CONFIG.overlap_file, sep='\t', index=False, quoting=csv.QUOTE_NONNUMERIC)
 
 
 def create_copy_script(overlap_df: pd.DataFrame, copy_folder: str = './tmp') -> None:  # pragma: no cover
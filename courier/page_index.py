@@ -0,0 +1,121 @@
+import itertools
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class PageIndex:
+    """Inverted index from (courier_id, page) to the record numbers of the articles on that page.
+
+    Pages are stored CSR-style: a sorted array of (courier_id, page) keys, and offsets into a single array of
+    record numbers. Record numbers of a page are kept in article index order, which is also the order of
+    `CourierIssue.articles`.
+    """
+
+    def __init__(self, article_index: pd.DataFrame):
+        pages_per_article: List[List[int]] = article_index['pages'].tolist()
+        lengths = np.fromiter(map(len, pages_per_article), dtype=np.int64, count=len(pages_per_article))
+        pages = np.fromiter(itertools.chain.from_iterable(pages_per_article), dtype=np.int64, count=lengths.sum())
+        courier_ids = np.repeat(article_index['courier_id'].astype(np.int64).to_numpy(), lengths)
+        record_numbers = np.repeat(article_index['record_number'].to_numpy(dtype=np.uint32), lengths)
+
+        keys = self._encode(courier_ids, pages)
+        order = np.argsort(keys, kind='stable')
+        self._keys, starts = np.unique(keys[order], return_index=True)
+        self._offsets: np.ndarray = np.append(starts, len(keys))
+        self._record_numbers: np.ndarray = record_numbers[order]
+
+    @staticmethod
+    def _encode(courier_id: np.ndarray, page: np.ndarray) -> np.ndarray:
+        return (courier_id << 32) | page
+
+    def _find(self, courier_id: str, page: int) -> Optional[int]:
+        key = (int(courier_id) << 32) | page
+        i = int(np.searchsorted(self._keys, key))
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return None
+
+    def get_record_numbers(self, courier_id: str, page: int) -> List[int]:
+        """Returns record numbers of the articles on `page` in issue `courier_id`"""
+        i = self._find(courier_id, page)
+        if i is None:
+            return []
+        return self._record_numbers[self._offsets[i] : self._offsets[i + 1]].tolist()
+
+    def count(self, courier_id: str, page: int) -> int:
+        i = self._find(courier_id, page)
+        return 0 if i is None else int(self._offsets[i + 1] - self._offsets[i])
+
+    def counts(self, courier_ids: np.ndarray, pages: np.ndarray) -> np.ndarray:
+        """Returns the number of articles on each of the given pages, zero for pages not in the index"""
+        keys = self._encode(np.asarray(courier_ids, dtype=np.int64), np.asarray(pages, dtype=np.int64))
+        if len(self._keys) == 0:
+            return np.zeros(len(keys), dtype=np.int64)
+        i = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[i] == keys, self._offsets[i + 1] - self._offsets[i], 0)
+
+    def overlapping_pages(self) -> pd.DataFrame:
+        """Returns pages shared by more than one article, sorted by courier_id and page"""
+        counts = np.diff(self._offsets)
+        keys = self._keys[counts > 1]
+        return pd.DataFrame(
+            {'courier_id': keys >> 32, 'page': keys & 0xFFFFFFFF, 'count': counts[counts > 1]}, dtype='int64'
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._keys.nbytes + self._offsets.nbytes + self._record_numbers.nbytes
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        for key in self._keys.tolist():
+            yield str(key >> 32).zfill(6), key & 0xFFFFFFFF
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class PageIntervalIndex:
+    """Index of items, e.g. the articles of an issue, by the page ranges they cover.
+
+    The pages of each item are stored as intervals of consecutive pages, so an item covering pages 3-40 is a
+    single interval. Queries return the positions of the items covering a page, in item order.
+
+    Intervals are sorted by first page, with a running maximum of their last pages, so a query only checks the
+    intervals between the first one that can reach the page and the last one that starts on or before it, both
+    found with a binary search.
+    """
+
+    def __init__(self, page_numbers: Sequence[Iterable[int]]):
+        intervals: List[Tuple[int, int, int]] = []
+        for position, pages in enumerate(page_numbers):
+            for start, end in self.to_intervals(pages):
+                intervals.append((start, end, position))
+        intervals.sort()
+        self._starts: np.ndarray = np.array([x[0] for x in intervals], dtype=np.int64)
+        self._ends: np.ndarray = np.array([x[1] for x in intervals], dtype=np.int64)
+        self._positions: np.ndarray = np.array([x[2] for x in intervals], dtype=np.int64)
+        self._max_ends: np.ndarray = np.maximum.accumulate(self._ends)
+
+    @staticmethod
+    def to_intervals(pages: Iterable[int]) -> List[Tuple[int, int]]:
+        """Returns runs of consecutive pages as (first, last) intervals"""
+        intervals: List[Tuple[int, int]] = []
+        for page in sorted(set(pages)):
+            if intervals and intervals[-1][1] == page - 1:
+                intervals[-1] = (intervals[-1][0], page)
+            else:
+                intervals.append((page, page))
+        return intervals
+
+    def query(self, page: int) -> List[int]:
+        """Returns positions of the items covering `page`"""
+        lo: int = int(np.searchsorted(self._max_ends, page, side='left'))
+        hi: int = int(np.searchsorted(self._starts, page, side='right'))
+        if lo >= hi:
+            return []
+        return np.unique(self._positions[lo:hi][self._ends[lo:hi] >= page]).tolist()
+
+    def __len__(self) -> int:
+        return len(self._starts)
@@ -0,0 +1,62 @@
+from typing import List
+
+import numpy as np
+
+
+class PageNumberMapping:
+    """Maps page numbers of an issue to PDF pages, and back, given the PDF page numbers of its double pages.
+
+    A double page is a single PDF page that holds two pages of the printed issue: the left page is stored in the
+    PDF and the right page is represented by a `DoubleSpreadRightPage`. Lookups are precomputed up to the last
+    double page, beyond that every page is shifted by the number of double pages.
+    """
+
+    def __init__(self, pdf_double_page_numbers: List[int]):
+        self.pdf_double_page_numbers: List[int] = list(pdf_double_page_numbers)
+        self.double_pages: List[int] = [x + i for i, x in enumerate(self.pdf_double_page_numbers)]
+
+        # Number of double pages below each page number, in page numbers and in PDF page numbers respectively
+        self._double_pages_below: List[int] = self._count_below(self.double_pages)
+        self._pdf_double_pages_below: List[int] = self._count_below(self.pdf_double_page_numbers)
+        self._is_double_spread_right: List[bool] = [False] * len(self._double_pages_below)
+        for double_page in self.double_pages:
+            if 0 <= double_page + 1 < len(self._is_double_spread_right):
+                self._is_double_spread_right[double_page + 1] = True
+
+        # PDF page index to page number
+        self._page_numbers: List[int] = [
+            page_number
+            for page_number in range(1, len(self._double_pages_below))
+            if not self._is_double_spread_right[page_number]
+        ]
+
+    @staticmethod
+    def _count_below(page_numbers: List[int]) -> List[int]:
+        size = max(page_numbers, default=0) + 2
+        return np.searchsorted(np.sort(page_numbers), np.arange(size), side='left').tolist()
+
+    @staticmethod
+    def _lookup(table: List[int], page_number: int) -> int:
+        if page_number < 0:
+            return 0
+        return table[min(page_number, len(table) - 1)]
+
+    def to_pdf_page_number(self, page_number: int) -> int:
+        """Returns the (zero-based) index of the PDF page that holds `page_number`"""
+        return page_number - 1 - self._lookup(self._double_pages_below, page_number)
+
+    def to_page_number(self, pdf_page_number: int) -> int:
+        """Returns the page number of the (zero-based) PDF page index `pdf_page_number`"""
+        if 0 <= pdf_page_number < len(self._page_numbers):
+            return self._page_numbers[pdf_page_number]
+        return pdf_page_number + 1 + len(self.double_pages)
+
+    def is_double_spread_right(self, page_number: int) -> bool:
+        return 0 <= page_number < len(self._is_double_spread_right) and self._is_double_spread_right[page_number]
+
+    def corrected_page_number(self, page_number: int) -> int:
+        """Returns `page_number` less the number of double pages with a lower PDF page number"""
+        return page_number - self._lookup(self._pdf_double_pages_below, page_number)
+
+    def num_pages(self, num_pdf_pages: int) -> int:
+        return num_pdf_pages + len(self.double_pages)
@@ -1,16 +1,25 @@
+import multiprocessing
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import Callable, List, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple, Union, runtime_checkable
 
 import argh
+import numpy as np
 import pandas as pd
+import rapidfuzz
 from fuzzywuzzy import process
 from loguru import logger
 
 from courier.config import get_config
-from courier.elements import CourierIssue
-from courier.overlap_check import get_overlapping_pages
+from courier.elements import CourierIssue, Page
+from courier.issue_cache import IssueCache, get_issue_cache
+from courier.overlap_check import get_overlapping_pages, get_page_index
+from courier.page_index import PageIndex
+from courier.page_numbers import PageNumberMapping
+from courier.title_locator import TitleLocator
 
 CONFIG = get_config()
 
@@ -41,6 +50,105 @@ def find_title_fuzzywuzzy(text: str, title: str, min_score: int = 90) -> bool:
     return bool(value > min_score)
 
 
+@runtime_checkable
+class BatchTitleMatcher(Protocol):
+    """A title matcher that matches all titles of a page in a single call, used as such by `match_titles`"""
+
+    def match_titles(self, text: str, titles: List[str]) -> List[bool]:
+        ...
+
+
+class FuzzyTitleMatcher:
+    """Batched fuzzy matching of titles against the lines of a page.
+
+    Scores all titles of a page against all of its lines in one call to `rapidfuzz.process.cdist`, and a title
+    is found if its best score is above `min_score`. Can also be used as a `match_function` for a single title.
+
+    Args:
+        scorer (Callable[..., float], optional): A rapidfuzz scorer. Defaults to `fuzz.WRatio`, as `fuzzywuzzy`.
+        min_score (float, optional): Title is found if score > min_score. Defaults to 90.
+        score_cutoff (Optional[float], optional): Scores below the cutoff are set to 0, which lets some scorers
+            exit early. Defaults to None.
+        workers (int, optional): Number of threads used by `cdist`, -1 uses all cores. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        scorer: Callable[..., float] = rapidfuzz.fuzz.WRatio,
+        min_score: float = 90,
+        score_cutoff: Optional[float] = None,
+        workers: int = 1,
+    ):
+        if not 0 <= min_score <= 100:
+            raise ValueError('min_score must be in the range [0, 100]')
+        self.scorer: Callable[..., float] = scorer
+        self.min_score: float = min_score
+        self.score_cutoff: Optional[float] = score_cutoff
+        self.workers: int = workers
+
+    def scores(self, text: str, titles: List[str]) -> np.ndarray:
+        """Returns the best score of each title on any line of `text`"""
+        lines = text.splitlines()
+        if not titles or not lines:
+            return np.zeros(len(titles))
+        matrix = rapidfuzz.process.cdist(
+            titles,
+            lines,
+            scorer=self.scorer,
+            processor=rapidfuzz.utils.default_process,
+            score_cutoff=self.score_cutoff,
+            workers=self.workers,
+        )
+        return matrix.max(axis=1)
+
+    def match_titles(self, text: str, titles: List[str]) -> List[bool]:
+        return (self.scores(text, titles) > self.min_score).tolist()
+
+    def __call__(self, text: str, title: str) -> bool:
+        return self.match_titles(text, [title])[0]
+
+
+class TitleLocatorMatcher:
+    """Finds all titles of a page in a single scan of its text with a `TitleLocator` (Aho-Corasick automaton).
+
+    Exact matches are the same as those of `find_title_regex`. `get_overlap_stats` builds a single locator per
+    issue, from all titles of the issue, with `locator`.
+
+    Args:
+        max_l_dist (int, optional): Maximum Levenshtein distance of approximate matches, for titles that aren't
+            found exactly. Defaults to 0 (exact matches only).
+    """
+
+    def __init__(self, max_l_dist: int = 0):
+        self.max_l_dist: int = max_l_dist
+
+    def locator(self, titles: Iterable[str]) -> TitleLocator:
+        return TitleLocator(titles, max_l_dist=self.max_l_dist)
+
+    def match_titles(self, text: str, titles: List[str]) -> List[bool]:
+        return self.locator(titles).match_titles(text, titles)
+
+    def __call__(self, text: str, title: str) -> bool:
+        return self.match_titles(text, [title])[0]
+
+
+def match_titles(
+    match_function: Union[Callable[[str, str], bool], BatchTitleMatcher], text: str, titles: List[str]
+) -> List[bool]:
+    """Returns whether each title is found in `text`, in a single call if `match_function` supports batches"""
+    if isinstance(match_function, BatchTitleMatcher):
+        return match_function.match_titles(text, titles)
+    return [match_function(text, title) for title in titles]
+
+
+MATCH_FUNCTIONS: Dict[str, Callable[[str, str], bool]] = {
+    'regex': find_title_regex,
+    'fuzzywuzzy': find_title_fuzzywuzzy,
+    'rapidfuzz': FuzzyTitleMatcher(),
+    'aho-corasick': TitleLocatorMatcher(),
+}
+
+
 def find_uppercase_sequences(text: str, min_word_len: int = 1, min_seq_len: int = 1) -> List[str]:
     expr = rf'\b[A-Z]{{{min_word_len},}}(?:\s+[A-Z]{{{min_word_len},}}){{{min_seq_len - 1},}}\b'
     return re.findall(expr, text)
@@ -50,75 +158,217 @@ def uppercase_sequence_count(text: str, min_word_len: int = 1, min_seq_len: int
     return len(find_uppercase_sequences(text, min_word_len, min_seq_len))
 
 
-def corrected_page_number(courier_id: str, page_number: int) -> int:
-    return page_number - len([dpn for dpn in CONFIG.double_pages.get(courier_id, []) if dpn < page_number])
+def corrected_page_number(
+    courier_id: str, page_number: int, double_pages: Optional[Dict[str, List[int]]] = None
+) -> int:
+    if double_pages is None:
+        return CONFIG.get_page_number_mapping(courier_id).corrected_page_number(page_number)
+    return PageNumberMapping(double_pages.get(courier_id, [])).corrected_page_number(page_number)
 
 
-def get_stats(
-    article_index: pd.DataFrame, overlap: pd.DataFrame, match_function: Callable[[str, str], bool] = find_title_regex
-) -> pd.DataFrame:
+STATS_COLUMNS: List[str] = ['courier_id', 'page', 'page_corr', 'count', 'continued_count', 'uppercase_count']
 
-    index = article_index[['courier_id', 'catalogue_title', 'pages']]
-    overlap['courier_id'] = overlap.courier_id.apply(lambda x: str(x).zfill(6))
-    found = []
+# Legacy statistics files, as (match function, include uppercase_count)
+LEGACY_STATS_FILES: Dict[str, Tuple[str, bool]] = {
+    'overlap_stats_regex.csv': ('regex', False),
+    'overlap_stats_fuzzywuzzy.csv': ('fuzzywuzzy', False),
+    'overlap_stats_uppercase.csv': ('fuzzywuzzy', True),
+}
 
-    for row in overlap.to_dict('records'):
 
-        articles_on_page = index[
-            (index.courier_id == row['courier_id']) & index.pages.apply(lambda x, r=row: r['page'] in x)
-        ]
-        articles_on_page = articles_on_page.to_dict('records')
+def _get_issue_stats(
+    courier_id: str,
+    rows: List[Dict[str, Any]],
+    page_titles: List[List[str]],
+    match_functions: Dict[str, Callable[[str, str], bool]],
+    *,
+    double_pages: Optional[Dict[str, List[int]]] = None,
+    issue_cache: Optional[IssueCache] = None,
+) -> List[Dict[str, Any]]:
+    """Returns statistics of the overlapping pages `rows` of an issue, `page_titles` are the titles on each page"""
 
-        if row['count'] != len(articles_on_page):
-            logger.warning(f'Page count mismatch: {row["courier_id"]}')
+    get_page: Callable[[int], Page] = (
+        CourierIssue(courier_id).get_page if issue_cache is None else partial(issue_cache.get_page, courier_id)
+    )
+    # One title locator for all pages of the issue, instead of one per page
+    issue_titles: List[str] = [title for titles in page_titles for title in titles]
+    matchers: Dict[str, Union[Callable[[str, str], bool], BatchTitleMatcher]] = {
+        name: match_function.locator(issue_titles)
+        if isinstance(match_function, TitleLocatorMatcher)
+        else match_function
+        for name, match_function in match_functions.items()
+    }
+    stats: List[Dict[str, Any]] = []
 
-        row_page = corrected_page_number(row['courier_id'], row['page'])
-        text = CourierIssue(row['courier_id']).get_page(row_page).text
+    for row, titles in zip(rows, page_titles):
+
+        row_page = corrected_page_number(courier_id, row['page'], double_pages)
+        text = get_page(row_page).text
 
         page_stat = dict(row)
         page_stat['page_corr'] = row_page
-        page_stat['found'] = 0
-        page_stat['not_found'] = 0
         page_stat['continued_count'] = countinue_count(text)
         page_stat['uppercase_count'] = uppercase_sequence_count(text, 2, 2)
 
-        for article_info in articles_on_page:
-            title = article_info['catalogue_title']
-            m = match_function(text, title)
-            if m:
-                page_stat['found'] += 1
-            else:
-                page_stat['not_found'] += 1
+        for name, matcher in matchers.items():
+            matches = match_titles(matcher, text, titles)
+            page_stat[f'{name}_found'] = sum(matches)
+            page_stat[f'{name}_not_found'] = len(matches) - page_stat[f'{name}_found']
+
+        stats.append(page_stat)
+
+    return stats
+
+
+def get_overlap_stats(
+    article_index: pd.DataFrame,
+    overlap: pd.DataFrame,
+    match_functions: Dict[str, Callable[[str, str], bool]],
+    *,
+    double_pages: Optional[Dict[str, List[int]]] = None,
+    issue_cache: Optional[IssueCache] = None,
+    processes: Optional[int] = 1,
+    courier_ids: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Returns statistics of the overlapping pages, evaluating all match functions in a single pass.
+
+    Each page is loaded once. The result has one row per row in `overlap`, with the columns in `STATS_COLUMNS`
+    and "<name>_found" and "<name>_not_found" for each name in `match_functions`.
 
-        found.append(page_stat)
+    Args:
+        processes (Optional[int], optional): Number of worker processes that issues are distributed to, None uses
+            the number of CPUs. Match functions must be picklable if > 1. Defaults to 1 (the current process).
+            The issue cache is only used, and its statistics only logged, in the current process.
+        courier_ids (Optional[List[str]], optional): Limit statistics to these issues. Defaults to all issues.
+    """
 
-    stats = pd.DataFrame(found)
-    stats = stats[
-        ['courier_id', 'page', 'page_corr', 'count', 'found', 'not_found', 'continued_count', 'uppercase_count']
-    ]
+    issue_cache = get_issue_cache() if issue_cache is None else issue_cache
+    page_index: PageIndex = get_page_index(article_index)
+    titles: Dict[int, str] = dict(zip(article_index['record_number'], article_index['catalogue_title']))
+    overlap['courier_id'] = overlap.courier_id.apply(lambda x: str(x).zfill(6))
+    records: List[Dict[str, Any]] = overlap.to_dict('records')
+    if courier_ids is not None:
+        subset = set(courier_ids)
+        records = [row for row in records if row['courier_id'] in subset]
+    found: List[Dict[str, Any]] = [{} for _ in range(len(records))]
+
+    # Rows are grouped by issue, so that each issue is loaded once
+    groups: Dict[str, List[Tuple[int, Dict[str, Any], List[str]]]] = {}
+    for i, row in enumerate(records):
+        record_numbers: List[int] = page_index.get_record_numbers(row['courier_id'], row['page'])
+        if row['count'] != len(record_numbers):
+            logger.warning(f'Page count mismatch: {row["courier_id"]}')
+        groups.setdefault(row['courier_id'], []).append((i, row, [titles[x] for x in record_numbers]))
+
+    def merge(group: List[Tuple[int, Dict[str, Any], List[str]]], stats: List[Dict[str, Any]]) -> None:
+        for (i, _, _), page_stat in zip(group, stats):
+            found[i] = page_stat
+
+    if processes == 1:
+        for courier_id, group in sorted(groups.items()):
+            rows, page_titles = [x[1] for x in group], [x[2] for x in group]
+            issue_stats = _get_issue_stats(
+                courier_id, rows, page_titles, match_functions, double_pages=double_pages, issue_cache=issue_cache
+            )
+            merge(group, issue_stats)
+        issue_cache.log_statistics()
+    else:
+        # Workers are spawned, not forked, since JPype can't be used in a process forked after the JVM started
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(
+                    _get_issue_stats,
+                    courier_id,
+                    [x[1] for x in group],
+                    [x[2] for x in group],
+                    match_functions,
+                    double_pages=double_pages,
+                ): courier_id
+                for courier_id, group in groups.items()
+            }
+            for future in as_completed(futures):
+                merge(groups[futures[future]], future.result())
+
+    columns: List[str] = STATS_COLUMNS + [f'{name}_{x}' for name in match_functions for x in ['found', 'not_found']]
+    stats = pd.DataFrame(found, columns=columns)
 
     return stats
 
 
-# FIXME: add match_function argument
+def to_legacy_stats(stats: pd.DataFrame, name: str, uppercase_count: bool = True) -> pd.DataFrame:
+    """Returns the statistics of match function `name` in the layout of `get_stats`"""
+    stats = stats.rename(columns={f'{name}_found': 'found', f'{name}_not_found': 'not_found'})
+    columns = ['courier_id', 'page', 'page_corr', 'count', 'found', 'not_found', 'continued_count']
+    return stats[columns + ['uppercase_count'] if uppercase_count else columns]
+
+
+def get_stats(
+    article_index: pd.DataFrame,
+    overlap: pd.DataFrame,
+    match_function: Callable[[str, str], bool] = find_title_regex,
+    *,
+    double_pages: Optional[Dict[str, List[int]]] = None,
+    issue_cache: Optional[IssueCache] = None,
+    processes: Optional[int] = 1,
+    courier_ids: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    stats = get_overlap_stats(
+        article_index,
+        overlap,
+        {'match': match_function},
+        double_pages=double_pages,
+        issue_cache=issue_cache,
+        processes=processes,
+        courier_ids=courier_ids,
+    )
+    return to_legacy_stats(stats, 'match')
+
+
+@argh.arg('--match-functions', nargs='+', choices=list(MATCH_FUNCTIONS))
+@argh.arg('--courier-ids', nargs='+')
+@argh.arg('--processes', type=int)
 def save_stats(
-    output_file: Union[str, os.PathLike] = CONFIG.metadata_dir / 'overlap_stats.csv',
+    *,
+    output_file: Optional[Union[str, os.PathLike]] = None,
     sep: str = '\t',
     save_index: bool = False,
+    article_index: Optional[pd.DataFrame] = None,
+    match_functions: Optional[List[str]] = None,
+    legacy: bool = False,
+    processes: Optional[int] = 1,
+    courier_ids: Optional[List[str]] = None,
 ) -> None:
+    """Saves statistics of the overlapping pages for all `match_functions` to a single file.
+
+    If `legacy` is True, the legacy statistics files (`LEGACY_STATS_FILES`) of the evaluated match functions
+    are also written, to the same folder. `courier_ids` limits the statistics to a subset of issues.
 
+    Issues are processed in the current process by default, through the shared issue cache, whose hits and
+    misses are logged. With `processes` > 1 (None for the number of CPUs), issues are distributed to worker
+    processes that load them without the cache.
+    """
+
+    output_file = output_file or CONFIG.metadata_dir / 'overlap_stats.csv'
+    article_index = CONFIG.article_index if article_index is None else article_index
+    match_functions = match_functions or ['regex', 'fuzzywuzzy']
     output_folder = Path(output_file).parent
     Path(output_folder).mkdir(exist_ok=True, parents=True)
 
-    # TODO: get_match_function OR more columns in output
-
-    stats = get_stats(
-        article_index=CONFIG.article_index,
-        overlap=get_overlapping_pages(CONFIG.article_index),
-        match_function=find_title_fuzzywuzzy,
+    stats = get_overlap_stats(
+        article_index=article_index,
+        overlap=get_overlapping_pages(article_index),
+        match_functions={name: MATCH_FUNCTIONS[name] for name in match_functions},
+        processes=processes,
+        courier_ids=courier_ids,
     )
     stats.to_csv(Path(output_file), sep=sep, index=save_index)
 
+    if legacy:
+        for filename, (name, uppercase_count) in LEGACY_STATS_FILES.items():
+            if name in match_functions:
+                legacy_stats = to_legacy_stats(stats, name, uppercase_count)
+                legacy_stats.to_csv(output_folder / filename, sep=sep, index=save_index)
+
 
 if __name__ == '__main__':
     argh.dispatch_command(save_stats)
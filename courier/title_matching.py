@@ -0,0 +1,96 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# Returns a score if the candidate (second argument) matches the title (first argument), otherwise None
+Scorer = Callable[[FrozenSet[str], FrozenSet[str]], Optional[float]]
+
+
+def common_words_scorer(title_tokens: FrozenSet[str], candidate_tokens: FrozenSet[str]) -> Optional[float]:
+    """Matches if at least two words, and at least half of the title's words, are in the candidate"""
+    common_words = len(title_tokens & candidate_tokens)
+    if common_words >= 2 and common_words >= len(title_tokens) / 2:
+        return common_words / len(title_tokens)
+    return None
+
+
+@dataclass
+class TitleMatch:
+    position: int
+    title: str
+    score: float
+
+
+class PageTitles:
+    """Tokenized titles of a page, indexed by token"""
+
+    def __init__(self, titles: List[Tuple[int, str]], tokens: List[FrozenSet[str]]):
+        self.titles: List[Tuple[int, str]] = titles
+        self.tokens: List[FrozenSet[str]] = tokens
+        self.postings: Dict[str, List[int]] = {}
+        for i, candidate_tokens in enumerate(tokens):
+            for token in candidate_tokens:
+                self.postings.setdefault(token, []).append(i)
+
+    def common_token_counts(self, tokens: FrozenSet[str]) -> Counter:
+        """Returns the number of tokens each title has in common with `tokens`, titles without any are left out"""
+        return Counter(i for token in tokens for i in self.postings.get(token, []))
+
+
+class TitleMatcher:
+    """Finds the title on a page that matches an article's catalogue title.
+
+    Titles are tokenized (lowercased and split on whitespace) once, and the titles of a page are indexed by token,
+    so only titles that share at least `min_common_tokens` tokens with the catalogue title are scored.
+
+    The titles of a page are (position, title) pairs, as in `Page.titles`. Note that `ExtractedPage.titles` are
+    (title, position) pairs, which `Page.cleanup_titles` swaps.
+
+    Args:
+        scorer (Scorer, optional): Scores a candidate title. Defaults to `common_words_scorer`.
+        min_common_tokens (int, optional): Number of tokens a candidate must share with the title to be scored,
+            use 0 to score all candidates. Defaults to 2, as required by `common_words_scorer`.
+        selection (str, optional): "first" returns the first matching title on the page, "best" the one with the
+            highest score (the first one if tied). Defaults to "first".
+    """
+
+    def __init__(self, scorer: Scorer = common_words_scorer, min_common_tokens: int = 2, selection: str = 'first'):
+        if selection not in ('first', 'best'):
+            raise ValueError(f'Unknown selection "{selection}", must be "first" or "best"')
+        self.scorer: Scorer = scorer
+        self.min_common_tokens: int = min_common_tokens
+        self.selection: str = selection
+        self._tokens: Dict[str, FrozenSet[str]] = {}
+        self._pages: Dict[Tuple[Tuple[int, str], ...], PageTitles] = {}
+
+    def tokenize(self, title: str) -> FrozenSet[str]:
+        if title not in self._tokens:
+            self._tokens[title] = frozenset(title.lower().split())
+        return self._tokens[title]
+
+    def page_titles(self, titles: List[Tuple[int, str]]) -> PageTitles:
+        key = tuple(titles)
+        if key not in self._pages:
+            self._pages[key] = PageTitles(list(titles), [self.tokenize(title) for _, title in titles])
+        return self._pages[key]
+
+    def _candidates(self, tokens: FrozenSet[str], page_titles: PageTitles) -> List[int]:
+        if self.min_common_tokens <= 0:
+            return list(range(len(page_titles.titles)))
+        counts = page_titles.common_token_counts(tokens)
+        return sorted(i for i, count in counts.items() if count >= self.min_common_tokens)
+
+    def match(self, title: str, titles: List[Tuple[int, str]]) -> Optional[TitleMatch]:
+        """Returns the matching title among `titles`, a list of (position, title), or None if there is none"""
+        tokens: FrozenSet[str] = self.tokenize(title)
+        page_titles: PageTitles = self.page_titles(titles)
+        best: Optional[TitleMatch] = None
+        for i in self._candidates(tokens, page_titles):
+            score: Optional[float] = self.scorer(tokens, page_titles.tokens[i])
+            if score is None:
+                continue
+            if best is None or score > best.score:
+                best = TitleMatch(position=page_titles.titles[i][0], title=page_titles.titles[i][1], score=score)
+            if self.selection == 'first':
+                break
+        return best
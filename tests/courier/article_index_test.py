@@ -1,13 +1,20 @@
+import pandas as pd
 import pytest
 
 from courier.article_index import (
     article_index_to_csv,
+    expand_article_pages,
+    extract_courier_ids,
+    get_article_index_cache_file,
     get_article_index_from_file,
     get_courier_id,
     get_english_host_item,
     get_expanded_article_pages,
+    load_article_index,
+    rebuild_article_index_cache,
 )
 from courier.config import get_config
+from tests.courier.utils import get_article_index_from_file_rowwise
 
 CONFIG = get_config()
 
@@ -95,3 +102,74 @@ def test_get_article_index_from_file_returns_dataframe_with_expected_shape_and_c
 def test_article_index_to_csv(tmp_path):
     article_index_to_csv(get_article_index_from_file(CONFIG.metadata_file), tmp_path)
     assert (tmp_path / 'article_index.csv').exists()
+
+
+def create_metadata_file(filename, titles=('A title', 'Another title')):
+    header = 'Record number;Catalogue - Title;Languages;Document type;Host item;Catalogue - Publication date\n'
+    rows = [
+        f'{i};{title};eng;article;The Unesco Courier 1966 p. {i}-{i + 1}, illus. 12656 eng;1966-09\n'
+        for i, title in enumerate(titles, 1)
+    ]
+    filename.write_text(header + ''.join(rows))
+    return filename
+
+
+def test_load_article_index_creates_and_uses_cache(tmp_path, monkeypatch):
+    filename = create_metadata_file(tmp_path / 'metadata.csv')
+    cache_file = get_article_index_cache_file(filename)
+
+    article_index = load_article_index(filename)
+    assert cache_file.exists()
+    assert article_index.equals(get_article_index_from_file(filename))
+
+    monkeypatch.setattr('courier.article_index.get_article_index_from_file', lambda _: pytest.fail('Cache not used'))
+    assert load_article_index(filename).equals(article_index)
+
+
+def test_load_article_index_rebuilds_cache_when_file_or_version_changes(tmp_path, monkeypatch):
+    filename = create_metadata_file(tmp_path / 'metadata.csv')
+    load_article_index(filename)
+
+    create_metadata_file(filename, titles=('A new title',))
+    assert load_article_index(filename).catalogue_title.tolist() == ['A new title']
+
+    monkeypatch.setattr('courier.article_index.ARTICLE_INDEX_VERSION', -1)
+    monkeypatch.setattr('courier.article_index.get_article_index_from_file', lambda _: 'rebuilt')
+    assert load_article_index(filename) == 'rebuilt'
+
+
+def test_rebuild_article_index_cache(tmp_path):
+    filename = create_metadata_file(tmp_path / 'metadata.csv')
+    rebuild_article_index_cache(str(filename))
+    assert get_article_index_cache_file(filename) == tmp_path / 'metadata.article_index.pkl'
+    assert get_article_index_cache_file(filename).exists()
+    assert sorted(x.name for x in tmp_path.iterdir()) == ['metadata.article_index.pkl', 'metadata.csv']
+
+
+def test_extract_courier_ids_returns_same_values_as_get_courier_id():
+    eng_host_items = pd.Series(['Fill zeroes 123 eng', 'Text before 77050 eng', 'No matching ID eng', '123456 eng'])
+    result = extract_courier_ids(eng_host_items)
+    assert result.tolist()[:2] == ['000123', '077050']
+    assert result.isna().tolist() == [False, False, True, True]
+
+    with pytest.raises(ValueError, match='ID too long'):
+        extract_courier_ids(pd.Series(['Title 1234567 eng']))
+
+
+def test_expand_article_pages_returns_same_values_as_get_expanded_article_pages():
+    page_refs = pd.Series(
+        ['p. 1-2', 'p. 1', 'p. 1, 2 ', 'p. 1, 2-4 ', 'p.1-2', 'p.1', 'p. 1-2, 4 ', 'page 1', 'p., 1-2', 'p. 4-5, 1-2 '],
+        index=range(10, 20),
+    )
+    result = expand_article_pages(page_refs)
+    assert result.index.tolist() == page_refs.index.tolist()
+    assert result.tolist() == [get_expanded_article_pages(x) for x in page_refs]
+    assert expand_article_pages(pd.Series(['p. 3'])).tolist() == [[3]]
+    assert expand_article_pages(pd.Series([], dtype=object)).tolist() == []
+
+
+@pytest.mark.parametrize('chunksize', [None, 1000])
+def test_get_article_index_from_file_returns_same_result_as_rowwise_processing(chunksize):
+    expected = get_article_index_from_file_rowwise(CONFIG.metadata_file)
+    result = get_article_index_from_file(CONFIG.metadata_file, chunksize=chunksize)
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,196 @@
+"""Timing and memory benchmarks, run from the repository root with `python -m tests.courier.benchmarks [name ...]`.
+
+The results that the benchmarks compare are checked for equality by the tests, the benchmarks only report numbers.
+"""
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict
+
+import argh
+import pandas as pd
+from loguru import logger
+
+from courier.article_index import get_article_index_from_file
+from courier.compile_issues import IssueCompiler
+from courier.config import get_config
+from courier.elements import AssignArticlesToPages, CourierIssue
+from courier.extract.java_extractor import ExtractedIssue, ExtractedPage
+from courier.page_index import PageIndex
+from courier.split_article_pages import FuzzyTitleMatcher, find_title_fuzzywuzzy, find_title_regex
+from courier.title_locator import TitleLocator
+from tests.courier.utils import (
+    assign_articles_by_scan,
+    create_issue_with_many_articles,
+    create_overlapping_pages_text,
+    get_article_index_from_file_rowwise,
+    random_text,
+)
+
+CONFIG = get_config()
+
+
+def article_index() -> str:
+    """Compares vectorized and row-wise processing of a metadata file 10 times the size of the real one"""
+    metadata = pd.read_csv(CONFIG.metadata_file, sep=';', dtype=str)
+    timings: Dict[str, float] = {}
+    with TemporaryDirectory() as folder:
+        filename = Path(folder) / 'metadata_10x.csv'
+        pd.concat([metadata] * 10).to_csv(filename, sep=';', index=False)
+        for name, function in [
+            ('rowwise', get_article_index_from_file_rowwise),
+            ('vectorized', get_article_index_from_file),
+            ('chunked', lambda x: get_article_index_from_file(x, chunksize=10000)),
+        ]:
+            start = time.perf_counter()
+            function(filename)
+            timings[name] = time.perf_counter() - start
+    return ', '.join(f'{name}: {elapsed:.3f}s' for name, elapsed in timings.items())
+
+
+def page_index() -> str:
+    """Compares memory use and query time of the page index with the list-of-lists pages column"""
+    index = CONFIG.article_index
+    pages: list = index['pages'].tolist()
+    list_nbytes = sys.getsizeof(pages) + sum(sys.getsizeof(x) + sum(map(sys.getsizeof, x)) for x in pages)
+    index_of_pages = PageIndex(index)
+
+    queries = list(index_of_pages)
+    start = time.perf_counter()
+    for c, p in queries[:200]:
+        index[(index.courier_id == c) & index.pages.apply(lambda x, p=p: p in x)].record_number.tolist()
+    list_elapsed = (time.perf_counter() - start) / 200
+
+    start = time.perf_counter()
+    for c, p in queries:
+        index_of_pages.get_record_numbers(c, p)
+    index_elapsed = (time.perf_counter() - start) / len(queries)
+
+    return (
+        f'list of lists: {list_nbytes / 1024:.0f} KiB, {list_elapsed * 1e6:.0f} us/query; '
+        f'page index: {index_of_pages.nbytes / 1024:.0f} KiB, {index_elapsed * 1e6:.1f} us/query'
+    )
+
+
+def assign_articles_to_pages() -> str:
+    """Compares assignment with a scan over all articles on a synthetic issue with 500 articles on 400 pages"""
+
+    issue = create_issue_with_many_articles()
+    start = time.perf_counter()
+    assign_articles_by_scan(issue)
+    scan_elapsed = time.perf_counter() - start
+
+    issue = create_issue_with_many_articles()
+    start = time.perf_counter()
+    AssignArticlesToPages().assign(issue)
+    index_elapsed = time.perf_counter() - start
+
+    return f'scan: {scan_elapsed:.3f}s, interval index: {index_elapsed:.3f}s'
+
+
+def corpus_memory() -> str:
+    """Reports memory used by 671 issues with (at least) 40 pages of 4,000 characters each and their articles"""
+
+    def content_loader(courier_id: str) -> ExtractedIssue:
+        return ExtractedIssue(
+            pages=[
+                ExtractedPage(pdf_page_number=i, content=f'{courier_id} {i} ' + 'x' * 4000, titles=[('TITLE', 10)])
+                for i in range(max([40, *CONFIG.double_pages.get(courier_id, [])]))
+            ]
+        )
+
+    tracemalloc.start()
+    issues = [
+        CourierIssue(courier_id, content_loader=content_loader) for courier_id in sorted(CONFIG.courier_ids)[:671]
+    ]
+    for issue in issues:
+        AssignArticlesToPages().assign(issue)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_pages = sum(len(issue) for issue in issues)
+    num_articles = sum(issue.num_articles for issue in issues)
+    return f'{len(issues)} issues, {num_pages} pages, {num_articles} articles: {current / 1024 ** 2:.0f} MiB'
+
+
+def fuzzy_title_matcher() -> str:
+    """Compares fuzzywuzzy per title with batched matching on pages built from the titles of overlapping pages"""
+    pages = create_overlapping_pages_text(CONFIG.article_index)
+
+    start = time.perf_counter()
+    expected = [[find_title_fuzzywuzzy(text, title) for title in page_titles] for text, page_titles in pages]
+    fuzzywuzzy_elapsed = time.perf_counter() - start
+
+    matcher = FuzzyTitleMatcher()
+    start = time.perf_counter()
+    result = [matcher.match_titles(text, page_titles) for text, page_titles in pages]
+    batched_elapsed = time.perf_counter() - start
+
+    agreement = sum(x == y for e, r in zip(expected, result) for x, y in zip(e, r)) / sum(len(e) for e in expected)
+    return (
+        f'{len(pages)} pages, fuzzywuzzy: {fuzzywuzzy_elapsed:.3f}s, batched: {batched_elapsed:.3f}s, '
+        f'agreement: {agreement:.4f}'
+    )
+
+
+def title_locator() -> str:
+    """Compares a regex search per title with a single scan per page, for 50 titles on each of 200 pages"""
+    rng = random.Random(1)
+    words = ['the', 'world', 'of', 'unesco', 'culture', 'art', 'science', 'education', 'man', 'peace']
+    titles = [random_text(rng, words, rng.randint(2, 6)) for _ in range(50)]
+    pages = [random_text(rng, words, 600) for _ in range(200)]
+
+    start = time.perf_counter()
+    for text in pages:
+        for title in titles:
+            find_title_regex(text, title)
+    regex_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    locator = TitleLocator(titles)
+    for text in pages:
+        locator.match_titles(text, titles)
+    locator_elapsed = time.perf_counter() - start
+
+    return f'regex: {regex_elapsed:.3f}s, locator: {locator_elapsed:.3f}s'
+
+
+def compile_issues_memory() -> str:
+    """Reports peak memory used to compile an issue of 200 pages of 100,000 characters each"""
+    with TemporaryDirectory() as folder:
+        input_folder = Path(folder)
+        for i in range(200):
+            (input_folder / f'test_{i:04}.txt').write_text(f'page {i} ' + 'x' * 100_000)
+        compiler = IssueCompiler('courier_issue.xml')
+
+        tracemalloc.start()
+        compiler.compile_issues(['test'], input_folder, input_folder / 'output')
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size: int = (input_folder / 'output/test.xml').stat().st_size
+    return f'peak: {peak / 1024 ** 2:.1f} MiB, output: {size / 1024 ** 2:.1f} MiB'
+
+
+BENCHMARKS: Dict[str, Callable[[], str]] = {
+    'article_index': article_index,
+    'page_index': page_index,
+    'assign_articles_to_pages': assign_articles_to_pages,
+    'corpus_memory': corpus_memory,
+    'fuzzy_title_matcher': fuzzy_title_matcher,
+    'title_locator': title_locator,
+    'compile_issues_memory': compile_issues_memory,
+}
+
+
+def main(*names: str) -> None:
+    """Runs the named benchmarks, or all of them"""
+    for name in names or BENCHMARKS:
+        logger.info(f'{name}: {BENCHMARKS[name]()}')
+
+
+if __name__ == '__main__':
+    argh.dispatch_command(main)
@@ -2,6 +2,7 @@ import pytest
 from jinja2 import Template
 
 from courier.compile_issues import IssueCompiler, jinja_env, join_pages, read
+from courier.issue_xml import IssueXMLReader
 
 
 def test_read_returns_text(tmp_path):
@@ -55,3 +56,24 @@ def test_compile_issues(template, expected, tmp_path):
     IssueCompiler(template).compile_issues(['test'], tmp_path, tmp_path / 'output')
     result = read(tmp_path / 'output/test.xml')
     assert result == expected
+
+
+def test_compile_issues_logs_issues_without_pages(tmp_path, caplog):
+    (tmp_path / 'test1.txt').write_text('page one')
+
+    IssueCompiler('courier_issue.xml').compile_issues(['test', 'missing'], tmp_path, tmp_path / 'output')
+    assert 'No pages found for 1 of 2 issues' in caplog.text
+    assert sorted(x.name for x in (tmp_path / 'output').glob('*.xml')) == ['test.xml']
+
+
+def test_compile_issues_writes_same_bytes_as_render(tmp_path):
+    pages = ['  page one ]]> with cdata end\n', 'page two \x0b with illegal char', 'sida tre: åäö ✓', '']
+    for i, page in enumerate(pages, 1):
+        (tmp_path / f'012656engo_{i:04}.txt').write_text(page)
+    template = jinja_env.get_template('courier_issue.xml.jinja')
+    expected = template.render(basename='012656engo', pages=pages, template=template).encode('utf-8')
+
+    IssueCompiler('courier_issue.xml').compile_issues(['012656engo'], tmp_path, tmp_path / 'output')
+
+    assert (tmp_path / 'output/012656engo.xml').read_bytes() == expected
+    assert IssueXMLReader(tmp_path / 'output/012656engo.xml').read_page(1).strip() == 'page one ]]> with cdata end'
@@ -1,13 +1,20 @@
 import csv
+import subprocess
+import sys
 from pathlib import Path
 from typing import Dict, List
 
+import pandas as pd
 import pytest
 
-from courier.config import get_config, get_project_root
+from courier.config import CourierConfig, get_config, get_project_root
 
 CONFIG = get_config()
 
+# Max time (in seconds) spent in the courier modules themselves when importing the package (dependencies excluded),
+# with headroom for loaded machines
+IMPORT_TIME_BUDGET = 0.5
+
 
 def test_get_project_root_from_wrong_path_returns_path(monkeypatch):
     monkeypatch.setattr('os.getcwd', lambda: 'some/path')
@@ -62,3 +69,72 @@ def test_get_issue_article_index():
 
 def test_get_courier_issue_index_return_expected_values():
     assert len(CONFIG.get_issue_article_index('061468')) == 3
+
+
+def test_get_issue_article_index_returns_same_records_as_filtering_article_index():
+    for courier_id in CONFIG.article_index.courier_id.unique()[:50]:
+        expected = CONFIG.article_index[CONFIG.article_index['courier_id'] == courier_id].to_dict('records')
+        assert CONFIG.get_issue_article_index(courier_id) == expected
+    assert CONFIG.get_issue_article_index('000000') == []
+
+
+def test_get_issue_article_index_returns_copies():
+    CONFIG.get_issue_article_index('061468')[0]['catalogue_title'] = 'Changed'
+    assert CONFIG.get_issue_article_index('061468')[0]['catalogue_title'] != 'Changed'
+
+
+def test_courier_ids_are_rebuilt_when_article_index_is_set(tmp_path):
+    config = CourierConfig(metadata_file=tmp_path / 'missing.csv')
+    config.article_index = pd.DataFrame({'courier_id': ['000001', '000002', '000001'], 'record_number': [1, 2, 3]})
+    assert config.courier_ids == {'000001', '000002'}
+    assert [x['record_number'] for x in config.get_issue_article_index('000001')] == [1, 3]
+
+    config.article_index = pd.DataFrame({'courier_id': ['000003'], 'record_number': [4]})
+    assert config.courier_ids == {'000003'}
+    assert config.get_issue_article_index('000001') == []
+
+
+def test_config_does_not_read_metadata_until_accessed(tmp_path):
+    config = CourierConfig(metadata_file=tmp_path / 'missing.csv', double_pages_file=tmp_path / 'missing.csv')
+    with pytest.raises(FileNotFoundError):
+        _ = config.article_index
+    with pytest.raises(FileNotFoundError):
+        _ = config.double_pages
+
+
+def test_config_metadata_can_be_overridden(tmp_path):
+    config = CourierConfig(metadata_file=tmp_path / 'missing.csv')
+    config.article_index = pd.DataFrame({'courier_id': ['000001']})
+    config.double_pages = {'000001': [3]}
+    assert config.article_index.courier_id.tolist() == ['000001']
+    assert config.double_pages == {'000001': [3]}
+
+
+IMPORT_MODULES = [
+    'courier.elements',
+    'courier.extract_articles',
+    'courier.overlap_check',
+    'courier.split_article_pages',
+    'courier.compile_issues',
+]
+
+
+def test_import_courier_package_does_not_load_metadata():
+    code = (
+        f'import {", ".join(IMPORT_MODULES)}; from courier.config import get_config; config = get_config(); '
+        'assert config._article_index is None and config._double_pages is None'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+@pytest.mark.slow
+def test_import_courier_package_is_within_budget():
+    code = f'import {", ".join(IMPORT_MODULES)}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True
+    )
+
+    # Lines are formatted as "import time: self [us] | cumulative | imported package"
+    rows = [line.split('|') for line in result.stderr.splitlines() if line.startswith('import time:')]
+    self_time = sum(int(row[0].split(':')[1]) for row in rows if row[2].strip().split('.')[0] == 'courier') / 1e6
+    assert 0 < self_time < IMPORT_TIME_BUDGET
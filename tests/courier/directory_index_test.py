@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+
+from courier.directory_index import DirectoryIndex
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for name in ['012656eng.xml', '012656engo.xml', '012656fre.xml', '0126560eng.xml', '012657eng.xml', 'a.txt']:
+        (tmp_path / name).touch()
+    for name in ['012656_0001.txt', '012656_0002.txt', '012656_0002.txt.bak', '0126561.txt', '012656']:
+        (tmp_path / name).touch()
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    'prefix, suffix',
+    [('012656eng', '.xml'), ('012656', '.txt'), ('012656', ''), ('012657eng', '.xml'), ('999999', '.txt'), ('a', '')],
+)
+def test_files_returns_same_files_as_glob(folder, prefix, suffix):
+    assert DirectoryIndex(folder).files(prefix, suffix) == sorted(folder.glob(f'{prefix}*{suffix}'))
+
+
+def test_files_does_not_match_overlapping_prefix_and_suffix(tmp_path):
+    (tmp_path / 'a.txt').touch()
+    assert DirectoryIndex(tmp_path).files('a.txt', '.txt') == []
+
+
+def test_directory_index_of_missing_folder_is_empty(tmp_path):
+    index = DirectoryIndex(tmp_path / 'missing')
+    assert len(index) == 0
+    assert index.files('012656') == []
+
+
+def test_missing_and_duplicates_returns_prefixes_with_no_or_several_files(folder):
+    matches = DirectoryIndex(folder).match(['012656eng', '012657eng', '999999eng'], '.xml')
+
+    assert list(matches) == ['012656eng', '012657eng', '999999eng']
+    assert matches['012657eng'] == [Path(folder) / '012657eng.xml']
+    assert DirectoryIndex.missing_and_duplicates(matches) == (['999999eng'], ['012656eng'])
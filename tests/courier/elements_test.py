@@ -1,8 +1,12 @@
+import argparse
 import filecmp
+import io
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Optional
 
+import argh
+import pandas as pd
 import pytest
 import untangle
 
@@ -14,12 +18,20 @@ from courier.elements import (
     DoubleSpreadRightPage,
     IssueStatistics,
     Page,
+    PagesFactory,
     export_articles,
+    export_corpus,
+    get_article_filename,
+    get_issue_content,
     get_pdf_issue_content,
     get_xml_issue_content,
+    is_export_up_to_date,
+    iter_xml_pages,
+    main,
     read_xml,
 )
 from courier.extract.java_extractor import ExtractedIssue
+from tests.courier.utils import assign_articles_by_scan, create_issue_with_many_articles
 
 CONFIG = get_config()
 # TODO: Mock
@@ -39,6 +51,26 @@ def test_get_xml_issue_content_return_expected_values():
     assert 'SEPTEMBER 1966' in str(content.pages[2])
 
 
+@pytest.mark.parametrize('filename', ['012656engo.xml', '061468engo.xml', '069916engo.xml'])
+def test_iter_xml_pages_returns_same_pages_as_read_xml(filename):
+    expected = read_xml(CONFIG.test_files_dir / 'xml' / filename).document.page
+    pages = list(iter_xml_pages(CONFIG.test_files_dir / 'xml' / filename, chunk_size=1000))
+    assert [page.content for page in pages] == [page.cdata for page in expected]
+    assert [page.pdf_page_number for page in pages] == list(range(1, len(expected) + 1))
+
+
+def test_iter_xml_pages_removes_control_chars(tmp_path):
+    filename = tmp_path / 'issue.xml'
+    filename.write_text('<document id="000000">\n<page number="1"><![CDATA[\nA\x01B\n]]></page>\n</document>')
+    assert [page.content for page in iter_xml_pages(filename)] == ['\nAB\n']
+
+
+def test_courier_issue_with_xml_content_loader_returns_xml_pages():
+    issue = CourierIssue('069916', content_loader=get_xml_issue_content)
+    assert issue.get_page(1).text == get_xml_issue_content('069916').pages[0].content
+    assert isinstance(issue.get_page(11), DoubleSpreadRightPage)
+
+
 def test_get_xml_issue_content_with_invalid_id_raises_value_error():
     with pytest.raises(ValueError, match='Not a valid courier id'):
         get_xml_issue_content('0')
@@ -171,6 +203,37 @@ def test_courier_issue_get_page_when_issue_has_double_pages_returns_expected():
 #     assert pages[8].text != pages[9].text == pages[10].text == pages[11].text != pages[12].text
 
 
+def test_courier_issue_loads_content_on_first_page_access():
+    loaded = []
+
+    def content_loader(courier_id: str) -> ExtractedIssue:
+        loaded.append(courier_id)
+        return get_pdf_issue_content(courier_id)
+
+    issue = CourierIssue('069916', content_loader=content_loader)
+    assert issue.num_articles > 0
+    assert not issue.is_loaded and loaded == []
+
+    assert issue.get_page(10).text == get_pdf_issue_content('069916').pages[9].content
+    assert loaded == ['069916']
+    assert sum(page is not None for page in issue._pages) == 1  # pylint: disable=protected-access
+
+    pages = PagesFactory().create(issue)
+    assert [(p.page_number, p.text, p.titles) for p in issue.pages] == [
+        (p.page_number, p.text, p.titles) for p in pages
+    ]
+    assert issue[-1].page_number == len(issue)
+    assert issue.get_page(10) is issue.pages[9]
+    assert loaded == ['069916']
+
+
+def test_get_issue_content_without_pdf_returns_xml_content(monkeypatch, tmp_path):
+    monkeypatch.setattr(CONFIG, 'pdf_dir', tmp_path)
+    content: ExtractedIssue = get_issue_content('012656')
+    assert 'SEPTEMBER 1966' in content.pages[2].content
+    assert all(page.titles == [] for page in content.pages)
+
+
 # 069916;"10 11 24"
 def test_to_pdf_page_number():
     issue = CourierIssue('012656')
@@ -244,6 +307,49 @@ def test_AssignArticlesToPages_assignes_expected_pages_to_issue():
     # assert IssueStatistics(issue).assigned_pages == 22
 
 
+def test_AssignArticlesToPages_assigns_same_articles_as_scan_on_issue_with_many_articles():
+    expected = create_issue_with_many_articles()
+    assign_articles_by_scan(expected)
+
+    issue = create_issue_with_many_articles()
+    AssignArticlesToPages().assign(issue)
+
+    assert [[a.record_number for a in p.articles] for p in issue.pages] == [
+        [a.record_number for a in p.articles] for p in expected.pages
+    ]
+    assert [a.get_not_found_pages() for a in issue.articles] == [a.get_not_found_pages() for a in expected.articles]
+
+
+def get_article_text_by_concatenation(article: Article) -> str:
+    text: str = ''
+    text += f'{5*"-"} Title according to index: {article.catalogue_title}\n'
+    text += f'{5*"-"} Pages according to index: {",".join(str(x) for x in article.page_numbers)}\n'
+    text += f'{5*"-"} Assigned according to index: {article.page_numbers}\n'
+    text += f'{5*"-"} Missing pages: {article.get_not_found_pages()}\n'
+    text += f'{5*"-"}'.join(article.errors)
+    for page_number, page_text in article.texts:
+        text += f'\n{20*"-"} Page {page_number} {20*"-"}\n\n{page_text}\n'
+    return text
+
+
+@pytest.mark.parametrize('texts, errors', [([], []), ([(3, 'Page three'), (4, '')], ['Error 1', 'Error 2\n'])])
+def test_article_write_text_returns_same_text_as_concatenation(texts, errors):
+    article = Article(CourierIssue('012656'), '012656', 1966, 1, pages=[3, 4, 5], catalogue_title='A title')
+    article.texts = texts
+    article.errors = errors
+    fp = io.StringIO()
+    article.write_text(fp)
+
+    assert fp.getvalue() == get_article_text_by_concatenation(article)
+    assert article.get_text() == fp.getvalue()
+
+
+def test_page_article_and_issue_have_no_instance_dict():
+    issue = CourierIssue('012656')
+    for obj in [issue, issue.articles[0], issue.get_page(1), DoubleSpreadRightPage(2)]:
+        assert not hasattr(obj, '__dict__')
+
+
 def test_issue_has_no_consolidated_pages_as_default():
     issue = CourierIssue('012656')
     assert IssueStatistics(issue).consolidated_pages == 0
@@ -260,3 +366,62 @@ def test_export_articles_generates_expected_output():
         assert len(sorted(Path(output_dir).glob('*.txt'))) == 5
         assert filecmp.dircmp(output_dir, CONFIG.test_files_dir / 'expected/export_articles').diff_files == []
         assert len(filecmp.dircmp(output_dir, CONFIG.test_files_dir / 'not_expected').diff_files) == 1
+
+
+def test_export_corpus_exports_issues_and_skips_up_to_date_issues(tmp_path):
+    courier_ids = ['012656', '061468']
+    statistics = export_corpus(courier_ids, tmp_path, processes=1)
+
+    assert statistics.courier_id.tolist() == courier_ids
+    assert statistics.status.tolist() == ['exported', 'exported']
+    assert len(list(tmp_path.glob('*.txt'))) == statistics.number_of_articles.sum()
+    assert (tmp_path / 'issue_statistics.csv').exists()
+
+    skipped = export_corpus(courier_ids, tmp_path, processes=1)
+    assert skipped.status.tolist() == ['skipped', 'skipped']
+    assert skipped.total_pages.tolist() == statistics.total_pages.tolist()
+
+    forced = export_corpus(courier_ids, tmp_path, processes=2, force=True)
+    assert forced.status.tolist() == ['exported', 'exported']
+    assert forced.drop(columns='error').equals(statistics.drop(columns='error'))
+
+
+def test_is_export_up_to_date_ignores_articles_without_title_and_missing_source_files(monkeypatch, tmp_path):
+    articles = [
+        {'record_number': 1, 'catalogue_title': 'A title'},
+        {'record_number': 2, 'catalogue_title': None},
+        {'record_number': 3, 'catalogue_title': ''},
+    ]
+    monkeypatch.setattr(CONFIG, 'get_issue_article_index', lambda _: articles)
+    for name in ['metadata_file', 'double_pages_file', 'pdf_dir']:
+        monkeypatch.setattr(CONFIG, name, tmp_path / 'missing' / name)
+
+    assert not is_export_up_to_date('012656', tmp_path)
+    (tmp_path / get_article_filename('012656', 1, 'A title')).touch()
+    assert is_export_up_to_date('012656', tmp_path)
+
+
+def test_export_corpus_isolates_failing_issues(monkeypatch, tmp_path):
+    def export_articles_or_fail(courier_id, export_folder):
+        if courier_id == '061468':
+            raise ValueError('Extraction failed')
+        return export_articles(courier_id, export_folder)
+
+    monkeypatch.setattr('courier.elements.export_articles', export_articles_or_fail)
+    statistics = export_corpus(['061468', '012656'], tmp_path, processes=1)
+
+    assert statistics.status.tolist() == ['failed', 'exported']
+    assert 'Extraction failed' in statistics.error[0]
+
+
+def test_export_corpus_command_line_parses_courier_ids_and_processes(monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(
+        'courier.elements.export_corpus', lambda *args: calls.append(args) or pd.DataFrame({'status': []})
+    )
+    parser = argparse.ArgumentParser()
+    argh.set_default_command(parser, main)
+    argh.dispatch(parser, argv=['--courier-ids', '012656', '061468', '--processes', '2'])
+
+    assert calls == [(['012656', '061468'], None, None, 2, False)]
+    assert capsys.readouterr().out == ''
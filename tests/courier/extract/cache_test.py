@@ -0,0 +1,56 @@
+from courier.extract.cache import ExtractedIssueCache
+from courier.extract.java_extractor import ExtractedIssue, ExtractedPage
+
+PARAMETERS = {'title_font_size_in_pt': 5.5, 'min_title_length_in_characters': 8}
+
+
+def create_issue() -> ExtractedIssue:
+    return ExtractedIssue(
+        pages=[
+            ExtractedPage(pdf_page_number=1, content='page one', titles=[('A TITLE', 4)]),
+            ExtractedPage(pdf_page_number=2, content='page two ]]> åäö', titles=[]),
+        ]
+    )
+
+
+def test_cache_filename_is_sidecar_to_pdf(tmp_path):
+    cache = ExtractedIssueCache(PARAMETERS)
+    assert cache.filename(tmp_path / '012656engo.pdf') == tmp_path / '012656engo.extracted.json.gz'
+
+
+def test_load_returns_none_when_not_cached(tmp_path):
+    pdf_file = tmp_path / 'test.pdf'
+    pdf_file.write_bytes(b'%PDF')
+    assert ExtractedIssueCache(PARAMETERS).load(pdf_file) is None
+
+
+def test_store_and_load_returns_equal_issue(tmp_path):
+    pdf_file = tmp_path / 'test.pdf'
+    pdf_file.write_bytes(b'%PDF')
+    issue = create_issue()
+
+    cache = ExtractedIssueCache(PARAMETERS)
+    cache.store(pdf_file, issue)
+
+    assert cache.filename(pdf_file).exists()
+    assert cache.load(pdf_file) == issue
+    assert str(cache.load(pdf_file)) == str(issue)
+
+
+def test_load_returns_none_when_pdf_or_parameters_changed(tmp_path):
+    pdf_file = tmp_path / 'test.pdf'
+    pdf_file.write_bytes(b'%PDF')
+    ExtractedIssueCache(PARAMETERS).store(pdf_file, create_issue())
+
+    assert ExtractedIssueCache({**PARAMETERS, 'title_font_size_in_pt': 6.0}).load(pdf_file) is None
+
+    pdf_file.write_bytes(b'%PDF changed')
+    assert ExtractedIssueCache(PARAMETERS).load(pdf_file) is None
+
+
+def test_load_ignores_corrupt_cache_file(tmp_path):
+    pdf_file = tmp_path / 'test.pdf'
+    pdf_file.write_bytes(b'%PDF')
+    cache = ExtractedIssueCache(PARAMETERS)
+    cache.filename(pdf_file).write_bytes(b'not gzip')
+    assert cache.load(pdf_file) is None
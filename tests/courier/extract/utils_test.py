@@ -1,4 +1,4 @@
-from courier.extract.utils import get_filenames
+from courier.extract.utils import file_hash, get_filenames
 
 
 def test_get_filenames_returns_only_files_with_expected_extension(tmp_path):
@@ -14,3 +14,11 @@ def test_get_filenames_returns_only_files_with_expected_extension(tmp_path):
 
     assert get_filenames(txt_file) == []
     assert get_filenames(pdf_file) == get_filenames(tmp_path) == [pdf_file]
+
+
+def test_file_hash_depends_on_content(tmp_path):
+    (tmp_path / 'a.pdf').write_bytes(b'a')
+    (tmp_path / 'b.pdf').write_bytes(b'b')
+    (tmp_path / 'c.pdf').write_bytes(b'a')
+    assert file_hash(tmp_path / 'a.pdf') != file_hash(tmp_path / 'b.pdf')
+    assert file_hash(tmp_path / 'a.pdf') == file_hash(tmp_path / 'c.pdf')
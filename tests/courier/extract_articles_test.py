@@ -81,3 +81,47 @@ def test_extract_articles_logging(tmp_path, caplog):
     assert len([msg for msg in caplog.messages if 'No match' in msg]) == total_files - 1
     assert len([msg for msg in caplog.messages if 'Duplicate matches' in msg]) == 1
     assert len([msg for msg in caplog.messages if 'Missing courier_ids' in msg]) == 1
+
+
+def test_extract_articles_with_workers_writes_same_files_as_serial(tmp_path):
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'].isin(['012656', '069916', '061468'])]
+    for workers in [1, 2]:
+        extract_articles(
+            input_folder=CONFIG.test_files_dir / 'xml',
+            article_index=article_index,
+            template_name='article.xml.jinja',
+            output_folder=tmp_path / str(workers),
+            workers=workers,
+        )
+
+    serial = sorted(x.relative_to(tmp_path / '1') for x in (tmp_path / '1').rglob('*') if x.is_file())
+    parallel = sorted(x.relative_to(tmp_path / '2') for x in (tmp_path / '2').rglob('*') if x.is_file())
+    assert len(serial) > 1
+    assert parallel == serial
+    for x in serial:
+        assert (tmp_path / '2' / x).read_bytes() == (tmp_path / '1' / x).read_bytes()
+
+
+def test_extract_articles_logs_summary_of_duplicates(tmp_path, caplog):
+    (tmp_path / '012656eng.xml').touch()
+    (tmp_path / '012656engo.xml').touch()
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'].isin(['012656', '069916'])]
+
+    extract_articles(input_folder=tmp_path, article_index=article_index, output_folder=tmp_path, workers=2)
+    assert 'Duplicate courier_ids: 012656' in caplog.text
+    assert 'Missing courier_ids: 069916' in caplog.text
+
+
+def test_extract_articles_with_several_templates_writes_same_files_as_separate_runs(tmp_path):
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'].isin(['012656', '069916'])]
+    templates = ['article.xml.jinja', 'article.txt.jinja']
+    for template_name in templates:
+        extract_articles(CONFIG.test_files_dir / 'xml', article_index, template_name, tmp_path / 'separate')
+    extract_articles(CONFIG.test_files_dir / 'xml', article_index, templates, tmp_path / 'combined')
+
+    for output_format in ['xml', 'txt']:
+        separate = sorted((tmp_path / 'separate' / output_format).iterdir())
+        combined = sorted((tmp_path / 'combined' / output_format).iterdir())
+        assert separate
+        assert [x.name for x in combined] == [x.name for x in separate]
+        assert [x.read_bytes() for x in combined] == [x.read_bytes() for x in separate]
@@ -0,0 +1,54 @@
+from courier.elements import CourierIssue
+from courier.issue_cache import IssueCache, get_issue_cache, get_issue_size
+
+
+def test_issue_cache_returns_same_issue_and_counts_hits_and_misses():
+    cache = IssueCache()
+    issue = cache.get('012656')
+    assert isinstance(issue, CourierIssue)
+    assert cache.get('012656') is issue
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert '012656' in cache and len(cache) == 1
+
+
+def test_issue_cache_evicts_least_recently_used_issue():
+    cache = IssueCache(max_issues=2)
+    cache.get('012656')
+    cache.get('061468')
+    cache.get('012656')
+    cache.get('069916')
+    assert '061468' not in cache
+    assert '012656' in cache and '069916' in cache
+
+
+def test_issue_cache_evicts_issues_when_content_exceeds_max_bytes():
+    cache = IssueCache(max_bytes=1)
+    cache.get('012656').get_page(1)
+    assert get_issue_size(cache.get('012656')) > 1
+    cache.get('061468')
+    assert '012656' not in cache and len(cache) == 1
+
+
+def test_issue_cache_get_page_enforces_max_bytes_after_loading_content():
+    cache = IssueCache()
+    cache.get_page('012656', 1)
+    cache.max_bytes = cache.nbytes + 1
+
+    cache.get_page('069916', 1)
+    assert '012656' not in cache and '069916' in cache
+    assert cache.nbytes == get_issue_size(cache.get('069916'))
+
+
+def test_issue_cache_measures_each_issue_once(monkeypatch):
+    sizes = []
+    monkeypatch.setattr('courier.issue_cache.get_issue_size', lambda issue: sizes.append(issue.courier_id) or 100)
+    cache = IssueCache()
+    for _ in range(3):
+        cache.get_page('012656', 1)
+
+    assert cache.nbytes == 100
+    assert sizes == ['012656']
+
+
+def test_get_issue_cache_returns_shared_cache():
+    assert get_issue_cache() is get_issue_cache()
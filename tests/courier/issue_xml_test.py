@@ -0,0 +1,57 @@
+import os
+
+import pytest
+from jinja2 import Template
+
+from courier.compile_issues import IssueCompiler
+from courier.config import get_config
+from courier.elements import iter_xml_pages
+from courier.issue_xml import IssueXMLReader, PageOffsetIndex
+
+CONFIG = get_config()
+
+
+@pytest.mark.parametrize('filename', ['012656engo.xml', '061468engo.xml', '069916engo.xml'])
+def test_read_page_returns_same_text_as_iter_xml_pages(filename):
+    xml_file = CONFIG.test_files_dir / 'xml' / filename
+    reader = IssueXMLReader(xml_file)
+    pages = list(iter_xml_pages(xml_file))
+
+    assert len(reader) == len(pages)
+    assert [reader.read_page(page.pdf_page_number) for page in pages] == [page.content for page in pages]
+    assert not PageOffsetIndex.filename(xml_file).exists()
+
+
+def test_compile_issues_writes_offset_index(tmp_path):
+    (tmp_path / 'test1.txt').write_text('page one')
+    (tmp_path / 'test2.txt').write_text('page ]]> two åäö')
+    (tmp_path / 'test3.txt').write_text('page three')
+
+    IssueCompiler('courier_issue.xml').compile_issues(['test'], tmp_path, tmp_path / 'output')
+    xml_file = tmp_path / 'output/test.xml'
+    index = PageOffsetIndex.load(xml_file)
+
+    assert index is not None and len(index) == 3
+    assert sorted(x.name for x in (tmp_path / 'output').iterdir()) == ['test.offsets.json', 'test.xml']
+    assert IssueXMLReader(xml_file).read_page(2) == '\n\npage ]]> two åäö\n\n'
+    assert [IssueXMLReader(xml_file).read_page(x) for x in (1, 2, 3)] == [x.content for x in iter_xml_pages(xml_file)]
+    with pytest.raises(KeyError):
+        IssueXMLReader(xml_file).read_page(4)
+
+
+def test_offset_index_is_not_used_when_xml_file_changed(tmp_path):
+    (tmp_path / 'test1.txt').write_text('page one')
+    IssueCompiler('courier_issue.xml').compile_issues(['test'], tmp_path, tmp_path / 'output')
+    xml_file = tmp_path / 'output/test.xml'
+
+    xml_file.write_text(xml_file.read_text().replace('page one', 'page one, changed'))
+    os.utime(xml_file, ns=(0, 0))
+    assert PageOffsetIndex.load(xml_file) is None
+    assert IssueXMLReader(xml_file).read_page(1) == '\n\npage one, changed\n\n'
+
+
+def test_compile_issues_without_pages_writes_no_offset_index(tmp_path):
+    (tmp_path / 'test1.txt').write_text('page one')
+    template = Template('{% for page in pages %}\n--- {{ loop.index }} ---\n{{ page|trim }}{% endfor %}')
+    IssueCompiler(template).compile_issues(['test'], tmp_path, tmp_path / 'output', extension='txt')
+    assert [x.name for x in (tmp_path / 'output').iterdir()] == ['test.txt']
@@ -22,3 +22,12 @@ def test_save_overlapping_pages():
         op = get_overlapping_pages(CONFIG.article_index)
         save_overlapping_pages(op, (Path(output_dir) / 'op.csv'))
         assert len(list(Path(output_dir).iterdir())) == 1
+
+
+def test_get_overlapping_pages_of_custom_index_does_not_load_configured_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(CONFIG, '_article_index', None)
+    monkeypatch.setattr(CONFIG, 'metadata_file', tmp_path / 'missing.csv')
+    article_index = pd.DataFrame({'courier_id': ['000001', '000001'], 'record_number': [1, 2], 'pages': [[1, 2], [2]]})
+
+    assert get_overlapping_pages(article_index).values.tolist() == [[1, 2, 2]]
+    assert CONFIG._article_index is None  # pylint: disable=protected-access
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from courier.config import get_config
+from courier.page_index import PageIndex, PageIntervalIndex
+
+CONFIG = get_config()
+
+
+def get_overlapping_pages_by_exploding(article_index: pd.DataFrame) -> pd.DataFrame:
+    df_pages = article_index[['courier_id', 'record_number', 'pages']].explode('pages')
+    df_pages['courier_id'] = df_pages.courier_id.astype('int')
+    page_count = df_pages.groupby(['courier_id', 'pages']).size().reset_index()
+    page_count.columns = ['courier_id', 'page', 'count']
+    return page_count[page_count['count'] > 1].reset_index(drop=True).astype('int64')
+
+
+def test_page_index_returns_record_numbers_in_index_order():
+    article_index = pd.DataFrame(
+        {
+            'courier_id': ['000001', '000001', '000002'],
+            'record_number': [30, 10, 20],
+            'pages': [[1, 2], [2, 3], [2]],
+        }
+    )
+    page_index = PageIndex(article_index)
+
+    assert page_index.get_record_numbers('000001', 2) == [30, 10]
+    assert page_index.get_record_numbers('000001', 3) == [10]
+    assert page_index.get_record_numbers('000002', 2) == [20]
+    assert page_index.get_record_numbers('000002', 1) == []
+    assert page_index.count('000001', 2) == 2
+    assert len(page_index) == 4
+    assert page_index.overlapping_pages().values.tolist() == [[1, 2, 2]]
+    assert page_index.counts(np.array([1, 1, 2, 3]), np.array([2, 4, 2, 2])).tolist() == [2, 0, 1, 0]
+
+
+def test_empty_page_index_returns_no_pages():
+    page_index = PageIndex(pd.DataFrame({'courier_id': [], 'record_number': [], 'pages': []}))
+    assert len(page_index) == 0
+    assert page_index.get_record_numbers('000001', 1) == []
+    assert page_index.counts(np.array([1]), np.array([1])).tolist() == [0]
+    assert page_index.overlapping_pages().empty
+
+
+def test_page_index_returns_same_overlapping_pages_as_exploded_article_index():
+    expected = get_overlapping_pages_by_exploding(CONFIG.article_index)
+    result = CONFIG.page_index.overlapping_pages()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_page_index_returns_same_articles_as_scanning_article_pages():
+    index = CONFIG.article_index[CONFIG.article_index.courier_id.isin(['012656', '061468', '069916'])]
+    for courier_id, page in CONFIG.page_index:
+        if courier_id not in ('012656', '061468', '069916'):
+            continue
+        expected = index[(index.courier_id == courier_id) & index.pages.apply(lambda x, p=page: p in x)]
+        assert CONFIG.page_index.get_record_numbers(courier_id, page) == expected.record_number.tolist()
+
+
+def test_page_interval_index_returns_items_covering_page():
+    index = PageIntervalIndex([[1, 2, 3], [3, 4, 10], [], [2, 2], [7]])
+
+    assert PageIntervalIndex.to_intervals([4, 10, 3, 11, 3]) == [(3, 4), (10, 11)]
+    assert len(index) == 5
+    assert index.query(3) == [0, 1]
+    assert index.query(2) == [0, 3]
+    assert index.query(5) == []
+    assert index.query(10) == [1]
+
+
+def test_page_interval_index_query_returns_same_positions_as_scan():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        page_numbers = [rng.integers(1, 40, size=rng.integers(0, 8)).tolist() for _ in range(rng.integers(0, 10))]
+        index = PageIntervalIndex(page_numbers)
+        for page in range(42):
+            assert index.query(page) == [i for i, pages in enumerate(page_numbers) if page in pages]
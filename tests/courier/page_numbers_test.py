@@ -0,0 +1,39 @@
+import pytest
+
+from courier.config import get_config
+from courier.page_numbers import PageNumberMapping
+
+CONFIG = get_config()
+
+
+@pytest.mark.parametrize('pdf_double_page_numbers', [[], [10], [10, 11, 24], [3, 8], [1]])
+def test_page_number_mapping_returns_same_values_as_linear_scan(pdf_double_page_numbers):
+    mapping = PageNumberMapping(pdf_double_page_numbers)
+    double_pages = [x + i for i, x in enumerate(pdf_double_page_numbers)]
+
+    assert mapping.double_pages == double_pages
+    for page_number in range(0, 60):
+        assert mapping.to_pdf_page_number(page_number) == page_number - 1 - len(
+            [x for x in double_pages if x < page_number]
+        )
+        assert mapping.corrected_page_number(page_number) == page_number - len(
+            [x for x in pdf_double_page_numbers if x < page_number]
+        )
+        assert mapping.is_double_spread_right(page_number) == (page_number - 1 in double_pages)
+
+
+@pytest.mark.parametrize('pdf_double_page_numbers', [[], [10], [10, 11, 24], [1]])
+def test_to_page_number_is_inverse_of_to_pdf_page_number(pdf_double_page_numbers):
+    mapping = PageNumberMapping(pdf_double_page_numbers)
+    page_numbers = [x for x in range(1, mapping.num_pages(50) + 1) if not mapping.is_double_spread_right(x)]
+
+    assert len(page_numbers) == 50
+    for pdf_page_number, page_number in enumerate(page_numbers):
+        assert mapping.to_pdf_page_number(page_number) == pdf_page_number
+        assert mapping.to_page_number(pdf_page_number) == page_number
+
+
+def test_get_page_number_mapping_uses_double_pages():
+    mapping = CONFIG.get_page_number_mapping('069916')
+    assert mapping.double_pages == [10, 12, 26]
+    assert mapping is CONFIG.get_page_number_mapping('069916')
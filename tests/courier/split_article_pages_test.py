@@ -1,16 +1,30 @@
+import argparse
+from typing import Callable, Dict, List
+
+import argh
 import pandas as pd
 import pytest
+from rapidfuzz import fuzz
 
 from courier.config import get_config
 from courier.overlap_check import get_overlapping_pages
 from courier.split_article_pages import (
+    MATCH_FUNCTIONS,
+    STATS_COLUMNS,
+    BatchTitleMatcher,
+    FuzzyTitleMatcher,
+    TitleLocatorMatcher,
     corrected_page_number,
     create_regexp,
     find_title_fuzzywuzzy,
     find_title_regex,
+    get_overlap_stats,
     get_stats,
+    match_titles,
     save_stats,
+    to_legacy_stats,
 )
+from tests.courier.utils import create_overlapping_pages_text
 
 CONFIG = get_config()
 
@@ -40,6 +54,72 @@ def test_find_title_by_fuzzymatch_with_out_of_bounds_min_score_raises_value_erro
         find_title_fuzzywuzzy('test', 'test', min_score=-1)
 
 
+TEXT = 'THE COURIER\nA window open\non the world\nThe art of the potter: an ancient craft\n'
+
+
+def test_FuzzyTitleMatcher_with_out_of_bounds_min_score_raises_value_error():
+    with pytest.raises(ValueError, match='min_score'):
+        FuzzyTitleMatcher(min_score=101)
+
+
+def test_FuzzyTitleMatcher_agrees_with_fuzzywuzzy():
+    matcher = FuzzyTitleMatcher()
+    titles = [
+        'The art of the potter: an ancient craft',
+        'THE COURIER',
+        'Nuclear energy and the future',
+        'A window open on the world',
+    ]
+
+    assert matcher.match_titles(TEXT, titles) == [find_title_fuzzywuzzy(TEXT, title) for title in titles]
+    assert [matcher(TEXT, title) for title in titles] == [True, True, False, False]
+
+
+def test_FuzzyTitleMatcher_scores_returns_best_score_per_title():
+    matcher = FuzzyTitleMatcher(scorer=fuzz.ratio)
+    scores = matcher.scores(TEXT, ['the courier', 'on the worlds'])
+
+    assert scores.tolist() == [100.0, pytest.approx(fuzz.ratio('on the world', 'on the worlds'))]
+    assert matcher.scores('', ['the courier']).tolist() == [0.0]
+    assert matcher.scores(TEXT, []).tolist() == []
+
+
+def test_FuzzyTitleMatcher_with_score_cutoff_zeroes_low_scores():
+    matcher = FuzzyTitleMatcher(scorer=fuzz.ratio, score_cutoff=98)
+    assert matcher.scores(TEXT, ['the courier', 'on the worlds']).tolist() == [100.0, 0.0]
+
+
+def test_match_titles_calls_match_function_per_title_if_not_batched():
+    titles = ['the potter: an ancient craft', 'Nuclear energy']
+    assert match_titles(find_title_regex, TEXT, titles) == [True, False]
+    assert match_titles(MATCH_FUNCTIONS['rapidfuzz'], TEXT, titles) == [True, False]
+
+
+def test_match_titles_calls_any_batch_title_matcher_once():
+    class Matcher:
+        def __init__(self):
+            self.calls = 0
+
+        def match_titles(self, text: str, titles: List[str]) -> List[bool]:
+            self.calls += 1
+            return [title in text for title in titles]
+
+    matcher = Matcher()
+    assert isinstance(matcher, BatchTitleMatcher)
+    assert match_titles(matcher, TEXT, ['COURIER', 'Nuclear energy']) == [True, False]
+    assert matcher.calls == 1
+
+
+def test_FuzzyTitleMatcher_agrees_with_fuzzywuzzy_on_overlapping_pages():
+    pages = create_overlapping_pages_text(CONFIG.article_index)
+    expected = [[find_title_fuzzywuzzy(text, title) for title in page_titles] for text, page_titles in pages]
+    matcher = FuzzyTitleMatcher()
+    result = [matcher.match_titles(text, page_titles) for text, page_titles in pages]
+
+    agreement = sum(x == y for e, r in zip(expected, result) for x, y in zip(e, r)) / sum(len(e) for e in expected)
+    assert agreement > 0.99
+
+
 def test_create_regexp():
     title = 'A nice and happy! title.? 77Maybe#'
     expr = create_regexp(title)
@@ -98,5 +178,96 @@ def test_get_stats_logs_mismatches(caplog):
 @pytest.mark.skip(reason='Update')
 def test_save_stats(monkeypatch, tmp_path):
     monkeypatch.setattr(CONFIG, 'article_index', CONFIG.article_index.loc[14255])
-    save_stats(tmp_path / 'overlap_stats.csv')
+    save_stats(output_file=tmp_path / 'overlap_stats.csv')
     assert (tmp_path / 'overlap_stats.csv').exists()
+
+
+def test_get_stats_with_batched_matcher_returns_same_result_as_per_title_matching():
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'] == '012656']
+    overlap = get_overlapping_pages(article_index)
+    matcher = FuzzyTitleMatcher()
+
+    expected = get_stats(article_index, overlap, match_function=matcher.__call__)
+    result = get_stats(article_index, overlap, match_function=matcher)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_get_stats_with_title_locator_returns_same_result_as_find_title_regex():
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'] == '012656']
+    overlap = get_overlapping_pages(article_index)
+
+    expected = get_stats(article_index, overlap, match_function=find_title_regex)
+    result = get_stats(article_index, overlap, match_function=TitleLocatorMatcher())
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_get_overlap_stats_returns_same_result_as_get_stats_per_match_function():
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'] == '012656']
+    match_functions: Dict[str, Callable[[str, str], bool]] = {
+        'regex': find_title_regex,
+        'rapidfuzz': FuzzyTitleMatcher(),
+    }
+
+    stats = get_overlap_stats(article_index, get_overlapping_pages(article_index), match_functions)
+
+    assert list(stats.columns) == STATS_COLUMNS + [
+        'regex_found',
+        'regex_not_found',
+        'rapidfuzz_found',
+        'rapidfuzz_not_found',
+    ]
+    for name, match_function in match_functions.items():
+        expected = get_stats(article_index, get_overlapping_pages(article_index), match_function=match_function)
+        pd.testing.assert_frame_equal(to_legacy_stats(stats, name), expected)
+
+
+def test_save_stats_with_legacy_writes_legacy_files(tmp_path):
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'] == '012656']
+    save_stats(
+        output_file=tmp_path / 'overlap_stats.csv', article_index=article_index, match_functions=['regex'], legacy=True
+    )
+
+    stats = pd.read_csv(tmp_path / 'overlap_stats.csv', sep='\t')
+    regex_stats = pd.read_csv(tmp_path / 'overlap_stats_regex.csv', sep='\t')
+
+    assert list(stats.columns) == STATS_COLUMNS + ['regex_found', 'regex_not_found']
+    assert list(regex_stats.columns) == list(pd.read_csv(CONFIG.metadata_dir / 'overlap_stats_regex.csv', sep='\t'))
+    assert regex_stats['found'].tolist() == stats['regex_found'].tolist()
+    assert sorted(x.name for x in tmp_path.iterdir()) == ['overlap_stats.csv', 'overlap_stats_regex.csv']
+
+
+def test_get_overlap_stats_with_processes_returns_same_result_as_serial():
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'].isin(['012656', '069916'])]
+    overlap = get_overlapping_pages(article_index).sort_values('page', kind='stable').reset_index(drop=True)
+    match_functions: Dict[str, Callable[[str, str], bool]] = {
+        'regex': find_title_regex,
+        'rapidfuzz': FuzzyTitleMatcher(),
+        'aho': TitleLocatorMatcher(),
+    }
+
+    expected = get_overlap_stats(article_index, overlap.copy(), match_functions)
+    result = get_overlap_stats(article_index, overlap.copy(), match_functions, processes=2)
+
+    assert expected['courier_id'].nunique() > 1
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_get_stats_with_courier_ids_returns_stats_of_subset():
+    article_index = CONFIG.article_index[CONFIG.article_index['courier_id'].isin(['012656', '069916'])]
+    overlap = get_overlapping_pages(article_index)
+
+    stats = get_stats(article_index, overlap.copy())
+    subset = get_stats(article_index, overlap.copy(), courier_ids=['012656'])
+
+    assert set(subset['courier_id']) == {'012656'}
+    pd.testing.assert_frame_equal(subset, stats[stats['courier_id'] == '012656'].reset_index(drop=True))
+
+
+def test_save_stats_command_line_parses_processes_as_int():
+    parser = argparse.ArgumentParser()
+    argh.set_default_command(parser, save_stats)
+    args = parser.parse_args(['--processes', '4', '--courier-ids', '012656', '069916'])
+
+    assert args.processes == 4
+    assert args.courier_ids == ['012656', '069916']
+    assert parser.parse_args([]).processes == 1
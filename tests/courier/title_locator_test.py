@@ -0,0 +1,74 @@
+import random
+import re
+
+import pytest
+
+from courier.split_article_pages import create_regexp, find_title_regex
+from courier.title_locator import TitleHit, TitleLocator, normalize_text, title_pattern
+from tests.courier.utils import random_text
+
+TEXT = 'THE UNESCO COURIER\n\nA window open on the world — (cont\'d)\nArt of the potter: an ancient craft\n'
+
+
+def test_normalize_text_returns_offsets_of_normalized_characters():
+    text = '  Art, of\nthe ﬁrst—\u212aelvin!'
+    normalized, offsets = normalize_text(text)
+
+    assert normalized == ' art of the rst kelvin '
+    assert len(offsets) == len(normalized)
+    assert [text[offsets[i]] for i in range(1, 4)] == ['A', 'r', 't']
+    assert offsets[4] == text.index(',')
+
+
+@pytest.mark.parametrize('title', ['A nice and happy! title.? 77Maybe#', 'The UNESCO Courier', 'A', '', 'Ö'])
+def test_title_pattern_is_normalized_create_regexp(title):
+    assert title_pattern(title) == create_regexp(title).replace('[^a-zåäö]+', ' ')
+
+
+def test_find_all_returns_all_hits_with_offsets_in_text():
+    locator = TitleLocator(['The art of the potter', 'A window open on the world', 'the'])
+    hits = locator.find_all(TEXT)
+
+    assert TitleHit('A window open on the world', TEXT.index(' window'), TEXT.index(' —')) in hits
+    assert [TEXT[hit.start : hit.end] for hit in hits if hit.title == 'the'] == ['HE', 'he', 'he']
+    assert not any(hit.title == 'The art of the potter' for hit in hits)
+
+
+def test_locate_returns_first_hit_or_none():
+    locator = TitleLocator(['Courier', 'the', 'Nuclear energy'])
+    located = locator.locate(TEXT)
+
+    assert located['Courier'] == TitleHit('Courier', 12, 18)
+    assert located['the'] == TitleHit('the', 1, 3)
+    assert located['Nuclear energy'] is None
+
+
+def test_locate_with_max_l_dist_finds_approximate_hits():
+    locator = TitleLocator(['The UNESCO Kourier', 'Nuclear energy'], max_l_dist=1)
+    located = locator.locate(TEXT)
+
+    assert located['The UNESCO Kourier'] == TitleHit('The UNESCO Kourier', 1, 18, 1)
+    assert located['Nuclear energy'] is None
+
+
+def test_match_titles_returns_same_result_as_find_title_regex():
+    rng = random.Random(1)
+    words = ['the', 'The', 'WORLD', 'of', 'Unesco', 'art', 'a', 'i', 'År', 'ÖL', 'ſea', 'Kite', 'İnk', 'ınk', '7']
+    for _ in range(200):
+        titles = [random_text(rng, words, rng.randint(0, 4)) for _ in range(5)]
+        text = random_text(rng, words, 40)
+        expected = [find_title_regex(text, title) for title in titles]
+        assert TitleLocator(titles).match_titles(text, titles) == expected, (titles, text)
+
+
+def test_locate_returns_same_offsets_as_regex_search():
+    rng = random.Random(2)
+    words = ['the', 'WORLD', 'of', 'unesco', 'Art', 'a']
+    for _ in range(200):
+        titles = [random_text(rng, words, rng.randint(1, 3)) for _ in range(3)]
+        text = random_text(rng, words, 30)
+        located = TitleLocator(titles).locate(text)
+        for title in titles:
+            m = re.search(create_regexp(title), text, re.IGNORECASE)
+            hit = located[title]
+            assert (hit.start if hit is not None else None) == (m.start() if m else None)
@@ -0,0 +1,59 @@
+import random
+from typing import List, Optional, Tuple
+
+import pytest
+
+from courier.config import get_config
+from courier.title_matching import TitleMatcher, common_words_scorer
+
+CONFIG = get_config()
+
+
+def find_matching_title_position_by_scanning(title: str, titles: List[Tuple[int, str]]) -> Optional[int]:
+    title_bow = set(title.lower().split())
+    for position, candidate_title in titles:
+        common_words = title_bow.intersection(set(candidate_title.lower().split()))
+        if len(common_words) >= 2 and len(common_words) >= len(title_bow) / 2:
+            return position
+    return None
+
+
+def test_title_matcher_returns_same_positions_as_scanning_titles():
+    # Titles are (position, title) pairs, as in `Page.titles`
+    rng = random.Random(1)
+    catalogue_titles = [str(x) for x in CONFIG.article_index.catalogue_title.dropna().unique()[:300]]
+    words = ' '.join(catalogue_titles).split()
+    matcher = TitleMatcher()
+
+    for title in catalogue_titles:
+        titles = [(rng.randint(0, 5000), ' '.join(rng.sample(words, rng.randint(1, 6)))) for _ in range(10)]
+        titles.insert(rng.randint(0, 10), (9999, ' '.join(rng.sample(title.split(), max(1, len(title.split()) // 2)))))
+        expected = find_matching_title_position_by_scanning(title, titles)
+        match = matcher.match(title, titles)
+        assert (None if match is None else match.position) == expected
+
+
+def test_title_matcher_returns_match_with_score():
+    # (position, title) pairs, as in `Page.titles`
+    titles = [(10, 'The art of Sardinia'), (20, 'Bronze art of ancient Sardinia'), (30, 'Letters')]
+    first = TitleMatcher().match('Ancient bronze art of Sardinia', titles)
+    best = TitleMatcher(selection='best').match('Ancient bronze art of Sardinia', titles)
+
+    assert first is not None and best is not None
+    assert (first.position, first.title, first.score) == (10, 'The art of Sardinia', 0.6)
+    assert (best.position, best.score) == (20, 1.0)
+    assert TitleMatcher().match('Letters to the editor', titles) is None
+    assert TitleMatcher().match('', titles) is None
+
+
+def test_title_matcher_with_custom_scorer():
+    def any_common_word(title_tokens, candidate_tokens):
+        return 1.0 if title_tokens & candidate_tokens else None
+
+    matcher = TitleMatcher(scorer=any_common_word, min_common_tokens=1)
+    match = matcher.match('Letters to the editor', [(10, 'Art'), (30, 'Letters')])
+    assert match is not None
+    assert match.position == 30
+    assert common_words_scorer(frozenset(['a', 'b']), frozenset(['a'])) is None
+    with pytest.raises(ValueError):
+        TitleMatcher(selection='last')
@@ -0,0 +1,86 @@
+"""Synthetic data and reference implementations shared by the tests and `tests/courier/benchmarks.py`"""
+import os
+import random
+from typing import List, Tuple, Union
+
+import pandas as pd
+
+from courier.article_index import get_courier_id, get_english_host_item, get_expanded_article_pages
+from courier.elements import Article, CourierIssue, DoubleSpreadRightPage
+from courier.extract.java_extractor import ExtractedIssue, ExtractedPage
+from courier.page_index import PageIndex
+
+
+def create_issue_with_many_articles(num_articles: int = 500, num_pages: int = 400) -> CourierIssue:
+    """Returns issue 012656 with `num_pages` empty pages and `num_articles` articles of 1-3 pages each"""
+
+    def content_loader(_: str) -> ExtractedIssue:
+        return ExtractedIssue(pages=[ExtractedPage(pdf_page_number=i, content='', titles=[]) for i in range(num_pages)])
+
+    issue = CourierIssue('012656', content_loader=content_loader)
+    rng = random.Random(1)
+    issue.articles = [Article(issue, '012656', 1966, i, pages=None) for i in range(num_articles)]
+    for article in issue.articles:
+        first_page = rng.randint(1, num_pages - 2)
+        article.page_numbers = list(range(first_page, first_page + rng.randint(1, 3)))
+    return issue
+
+
+def assign_articles_by_scan(issue: CourierIssue) -> None:
+    """Reference implementation of `AssignArticlesToPages.assign` that scans all articles for each page"""
+    for page in issue.pages:
+        if not isinstance(page, DoubleSpreadRightPage):
+            page.articles = [a for a in issue.articles if page.page_number in a.page_numbers]
+            for article in page.articles:
+                article.pages.append(page)
+
+
+def create_overlapping_pages_text(article_index: pd.DataFrame) -> List[Tuple[str, List[str]]]:
+    """Returns a synthetic text and the titles of each overlapping page in `article_index`.
+
+    Each title is on a line of its own, either uppercased or truncated to half its length, among 40 lines of filler.
+    """
+    page_index = PageIndex(article_index)
+    titles = dict(zip(article_index['record_number'], article_index['catalogue_title']))
+    rng = random.Random(1)
+    pages: List[Tuple[str, List[str]]] = []
+    for row in page_index.overlapping_pages().itertuples():
+        page_titles = [titles[x] for x in page_index.get_record_numbers(str(row.courier_id).zfill(6), row.page)]
+        lines = [title.upper() if rng.random() < 0.5 else title[: len(title) // 2] for title in page_titles]
+        lines += [' '.join(rng.choice(['the', 'world', 'of', 'unesco', 'culture']) for _ in range(8))] * 40
+        rng.shuffle(lines)
+        pages.append(('\n'.join(lines), page_titles))
+    return pages
+
+
+def get_article_index_from_file_rowwise(filename: Union[str, os.PathLike]) -> pd.DataFrame:
+    """Reference implementation that processes the article index row by row"""
+    columns = [
+        'Record number',
+        'Catalogue - Title',
+        'Languages',
+        'Document type',
+        'Host item',
+        'Catalogue - Publication date',
+    ]
+    article_index = pd.read_csv(filename, usecols=columns, sep=';', dtype={'Record number': 'uint32'})
+    article_index.columns = ['record_number', 'catalogue_title', 'languages', 'document_type', 'host_item', 'date']
+    article_index = article_index[article_index['document_type'] == 'article']
+    article_index = article_index[article_index.languages.str.contains('eng')]
+    eng_host_item = article_index['host_item'].apply(get_english_host_item)
+    page_ref = pd.Series(
+        eng_host_item.str.extract(r'((?:p\.\,?|pages?)(?:\s*\d+(?:-\d+)*)(?:\,\s*\d{1,3}(?:-\d{1,3})*\s)*)')[0]
+    )
+    page_ref[article_index.record_number == 187812] = 'p. 18-31'
+    page_ref[article_index.record_number == 64927] = 'p. 28-29'
+    article_index['pages'] = page_ref.apply(get_expanded_article_pages)
+    article_index['courier_id'] = eng_host_item.apply(get_courier_id)
+    article_index['year'] = article_index.date.apply(lambda x: int(x[:4])).astype('uint16')
+    article_index = article_index.set_index(article_index['courier_id'].astype('uint32'))
+    article_index.index.rename('id', inplace=True)
+    return article_index[['courier_id', 'year', 'record_number', 'pages', 'catalogue_title']]
+
+
+def random_text(rng: random.Random, words: list, num_words: int) -> str:
+    separators = [' ', ' ', '\n', ', ', ' — ', '-', '. ', ' (', "'", '']
+    return ''.join(rng.choice(words) + rng.choice(separators) for _ in range(num_words))